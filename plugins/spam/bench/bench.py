@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["duckdb>=1.0"]
+# ///
+"""
+Stats-engine benchmark for SPAM.
+Generates (or reuses) synthetic datasets with synth_data.py and times, per
+size:
+
+    run_stats_query   full horizon report — duckdb (stats_query) and a
+                      pure-sqlite3 baseline of the same query
+    filtered_stats    last week's top 20 (--since, --top) — the sqlite3 path
+                      run_stats_query() takes, and DuckDB forced through it
+    extract           reconcile.extract_skill_events() over the transcripts
+    backfill          reconcile.backfill() into a copy of the DB
+    rollup_refresh    session_rollups.refresh() from scratch on a copy of the
+                      DB, then the incremental no-op refresh
+    session_report    top_pairs() + session_distribution() on the rollups
+    catalog_render    format-catalog render() (index build included) and
+                      streamed jsonl output
+    catalog_query     a filtered, paginated markdown page from a prebuilt index
+
+Results (median of --repeat runs, plus every run) are written as JSON so
+versions can be compared. Stats engines must return the baseline's rows; any
+failed bench is listed on stderr and the exit status is 1.
+
+    uv run --script bench.py --sizes 100000,1000000 --output results.json
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import io
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PLUGIN_DIR = BENCH_DIR.parent
+STATS_SCRIPTS = PLUGIN_DIR / "skills" / "spam-stats" / "scripts"
+CATALOG_SCRIPTS = PLUGIN_DIR / "skills" / "spam-catalog" / "scripts"
+sys.path.insert(0, str(STATS_SCRIPTS))
+sys.path.insert(0, str(BENCH_DIR))
+
+import catalog_index  # noqa: E402
+import reconcile  # noqa: E402
+import session_rollups  # noqa: E402
+import synth_data  # noqa: E402
+from stats_query import iter_duckdb_stats, iter_sqlite_stats, select_catalog  # noqa: E402
+
+SQLITE_STATS_QUERY = """
+    SELECT
+        component_name,
+        component_type,
+        SUM(CASE WHEN substr(invoked_at, 1, 10) = date('now') THEN 1 ELSE 0 END),
+        SUM(CASE WHEN invoked_at >= date('now', '-7 days') THEN 1 ELSE 0 END),
+        SUM(CASE WHEN invoked_at >= date('now', '-30 days') THEN 1 ELSE 0 END),
+        SUM(CASE WHEN invoked_at >= date('now', '-365 days') THEN 1 ELSE 0 END),
+        COUNT(*)
+    FROM activations
+    GROUP BY component_name, component_type
+"""
+
+
+def load_script(path: Path):
+    name = path.stem.replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sqlite_stats_query(db_path: str, catalog: dict) -> list[dict]:
+    """Baseline: the horizon report using only the sqlite3 stdlib module."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    counts = {(r[0], r[1]): r[2:] for r in conn.execute(SQLITE_STATS_QUERY)}
+    conn.close()
+    rows = []
+    for name, ctype in select_catalog(catalog):
+        c = counts.get((name, ctype), (0, 0, 0, 0, 0))
+        rows.append({"name": name, "type": ctype, "today": c[0], "weekly": c[1],
+                     "monthly": c[2], "yearly": c[3], "all_time": c[4]})
+    rows.sort(key=lambda r: (-r["all_time"], r["name"]))
+    return rows
+
+
+def time_runs(fn, repeat: int, setup=None) -> dict:
+    """Time ``fn`` ``repeat`` times; ``setup`` runs untimed before each run."""
+    runs = []
+    detail = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        detail = fn()
+        runs.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(runs), "runs_s": runs, "detail": detail}
+
+
+def available_engines() -> dict:
+    engines = {"sqlite": sqlite_stats_query}
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return engines
+    from stats_query import run_stats_query
+    engines["duckdb"] = run_stats_query
+    return engines
+
+
+def bench_dataset(data_dir: Path, manifest: dict, repeat: int, format_catalog) -> list[dict]:
+    db_path = data_dir / "activations.sqlite"
+    catalog = json.loads((data_dir / "catalog.json").read_text(encoding="utf-8"))
+    results = []
+
+    def record(bench: str, engine: str, fn, runs: int = repeat, setup=None):
+        entry = {"bench": bench, "engine": engine, "rows": manifest["rows"],
+                 "components": manifest["components"]}
+        try:
+            entry.update(time_runs(fn, runs, setup))
+        except Exception as exc:  # keep going; one engine failing is a result too
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+        results.append(entry)
+        status = f"{entry['median_s']:.4f}s" if "median_s" in entry else entry["error"]
+        print(f"  {bench:<16} {engine:<8} {status}", file=sys.stderr)
+
+    # Every engine is checked against the sqlite3 baseline on each run, so a
+    # query that errors or miscounts fails the benchmark instead of timing it
+    def checked(query, expected):
+        def run():
+            rows = query(str(db_path), catalog)
+            if rows != expected:
+                raise AssertionError("rows differ from the sqlite3 baseline")
+            return len(rows)
+        return run
+
+    baseline = sqlite_stats_query(str(db_path), catalog)
+    engines = available_engines()
+    for engine, query in engines.items():
+        record("run_stats_query", engine, checked(query, baseline))
+
+    # Last week's top 20: run_stats_query() answers it from sqlite3; DuckDB
+    # is forced through the same filters to show what the scanner costs
+    since = datetime.fromisoformat(manifest["end"]) - timedelta(days=7)
+    filters = {"since": since.strftime("%Y-%m-%dT%H:%M:%S"), "top": 20}
+    filtered = {"sqlite": iter_sqlite_stats}
+    if "duckdb" in engines:
+        filtered["duckdb"] = iter_duckdb_stats
+    expected = list(iter_sqlite_stats(str(db_path), catalog, **filters))
+    for engine, query in filtered.items():
+        record("filtered_stats", engine, checked(
+            lambda path, cat, q=query: list(q(path, cat, **filters)), expected))
+
+    events: list = []
+
+    def extract():
+        events[:] = reconcile.extract_skill_events(data_dir / "transcripts")
+        return len(events)
+
+    record("extract", "stdlib", extract)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backfill_db = Path(tmp) / "activations.sqlite"
+        rollup_db = Path(tmp) / "rollups.sqlite"
+        reconcile.DB_PATH = backfill_db
+
+        # Each run writes, so each one starts from a fresh copy; the copy is
+        # untimed setup (a multi-GB file at the larger sizes)
+        record("backfill", "sqlite", lambda: reconcile.backfill(events),
+               setup=lambda: shutil.copyfile(db_path, backfill_db))
+
+        def with_rollups(fn):
+            def run():
+                conn = sqlite3.connect(str(rollup_db))
+                try:
+                    return fn(conn)
+                finally:
+                    conn.close()
+            return run
+
+        record("rollup_refresh", "full", with_rollups(session_rollups.refresh),
+               setup=lambda: shutil.copyfile(db_path, rollup_db))
+        record("rollup_refresh", "noop", with_rollups(session_rollups.refresh))
+        record("session_report", "sqlite", with_rollups(
+            lambda conn: (len(session_rollups.top_pairs(conn, 20)),
+                          len(session_rollups.session_distribution(conn)))))
+
+    record("catalog_render", "markdown", lambda: len(format_catalog.render(catalog)))
+    index = catalog_index.build_index(catalog)
+    record("catalog_render", "jsonl", lambda: format_catalog.write_rows(
+        (index["entries"][pos] for pos in catalog_index.query(index)), "jsonl",
+        format_catalog.ENTRY_COLUMNS, out=io.StringIO()))
+    # Largest source section: the worst case for a per-plugin query
+    source = max(index["sections"], key=lambda s: index["sections"][s][1] - index["sections"][s][0])
+    record("catalog_query", "index", lambda: sum(1 for _ in format_catalog.iter_markdown(
+        index, catalog_index.query(index, source=source, lifecycle="active"), 0, 50)))
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "-C", str(PLUGIN_DIR), "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SPAM stats engine")
+    parser.add_argument("--sizes", default="100000,1000000",
+                        help="Comma-separated activation row counts (e.g. 1000000,10000000)")
+    parser.add_argument("--components", type=int, default=5000)
+    parser.add_argument("--transcripts", type=int, default=200)
+    parser.add_argument("--transcript-lines", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end", type=synth_data.parse_end, metavar="TIME",
+                        help="Fix the datasets' newest timestamp (ISO) so they are reproducible")
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "spam-bench",
+                        help="Where datasets are generated and reused between runs")
+    parser.add_argument("--output", type=Path,
+                        help="Results JSON (default: bench-<timestamp>.json in --data-dir)")
+    args = parser.parse_args(argv)
+
+    format_catalog = load_script(CATALOG_SCRIPTS / "format-catalog.py")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    for rows in sizes:
+        data_dir = args.data_dir / (f"rows{rows}-c{args.components}-t{args.transcripts}"
+                                    f"x{args.transcript_lines}-s{args.seed}"
+                                    + (f"-e{args.end:%Y%m%dT%H%M%S}" if args.end else ""))
+        manifest_path = data_dir / "manifest.json"
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            print(f"dataset {data_dir} (cached)", file=sys.stderr)
+        else:
+            print(f"dataset {data_dir} (generating)", file=sys.stderr)
+            t0 = time.perf_counter()
+            manifest = synth_data.generate(
+                data_dir, rows, components=args.components, transcripts=args.transcripts,
+                transcript_lines=args.transcript_lines, seed=args.seed, end=args.end,
+            )
+            print(f"  generated in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        results.extend(bench_dataset(data_dir, manifest, args.repeat, format_catalog))
+
+    try:
+        import duckdb
+        duckdb_version = duckdb.__version__
+    except ImportError:
+        duckdb_version = None
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "duckdb": duckdb_version,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = args.output or args.data_dir / f"bench-{report['meta']['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results: {output}", file=sys.stderr)
+    failed = [r for r in results if "error" in r]
+    for entry in failed:
+        print(f"FAILED {entry['bench']} ({entry['engine']}, {entry['rows']} rows): {entry['error']}",
+              file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
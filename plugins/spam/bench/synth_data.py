@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Synthetic SPAM datasets for benchmarking.
+Writes a realistic ``activations.sqlite``, a matching ``catalog.json``, and
+a transcript tree into one output directory:
+
+- popularity is Zipf-skewed across components (a few hot, a long tail)
+- timestamps arrive in session bursts, weighted toward working hours
+- detection methods are mixed per component type like real hook traffic
+
+Deterministic for a given ``--seed`` and ``--end`` (the newest timestamp;
+defaults to now, which makes timestamps differ run to run). Stdlib only.
+
+    python3 synth_data.py OUT_DIR --rows 1000000 --components 5000
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "skills" / "spam-stats" / "scripts"))
+from spam_schema import create_indexes, ensure_schema  # noqa: E402
+
+INSERT_BATCH = 50_000
+SKILL_SHARE = 0.7
+PROJECTS = 25
+METHOD_MIX = {
+    "skill": (("tool_call", 0.85), ("transcript", 0.15)),
+    "command": (("prompt_match", 0.7), ("bash_match", 0.3)),
+}
+
+
+def make_catalog(n_components: int, n_plugins: int, rng: random.Random,
+                 end: datetime | None = None) -> dict:
+    """Catalog shaped like catalog-builder.py output."""
+    sources = ["user", "project"] + [f"plugin:synth-{i:03d}" for i in range(n_plugins)]
+    skills, commands = [], []
+    for i in range(n_components):
+        source = rng.choice(sources)
+        scope = source if source in ("user", "project") else rng.choice(["user", "project", "user, project"])
+        lifecycle = rng.choices(["active", "passive", "dev"], [0.8, 0.15, 0.05])[0]
+        model = rng.choice(["", "claude-sonnet-4-5", "claude-haiku-4-5", "claude-opus-4-5"])
+        if rng.random() < SKILL_SHARE:
+            name = f"skill-{i:05d}"
+            skills.append({
+                "name": name, "source": source, "scope": scope, "lifecycle": "active",
+                "model": model, "description": f"Synthetic skill {i}",
+                "skill_md_path": f"/synth/{source}/skills/{name}/SKILL.md",
+            })
+        else:
+            name = f"cmd-{i:05d}"
+            commands.append({
+                "name": name, "source": source, "scope": scope, "lifecycle": lifecycle,
+                "model": model, "description": f"Synthetic command {i}",
+                "activation_pattern": f"/{name}",
+                "script_path": f"/synth/{source}/commands/{name}/scripts/run.py"
+                if rng.random() < 0.3 else "",
+            })
+    return {
+        "generated_at": (end or datetime.now(timezone.utc)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "skills": skills,
+        "commands": commands,
+    }
+
+
+def _components(catalog: dict) -> list[tuple[str, str]]:
+    return ([(s["name"], "skill") for s in catalog["skills"]]
+            + [(c["name"], "command") for c in catalog["commands"]])
+
+
+def _zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(n)))
+
+
+def iter_activations(catalog: dict, rows: int, days: int, rng: random.Random,
+                     zipf: float = 1.1, burst: int = 12, end: datetime | None = None):
+    """Yield ``(name, type, method, invoked_at, session_ref, cwd_ref)`` rows,
+    roughly in time order.
+
+    Rows come in sessions of ~``burst`` events a few seconds to minutes
+    apart; each session draws components from the Zipf distribution and
+    runs in one of ``PROJECTS`` working directories.
+    """
+    components = _components(catalog)
+    rng.shuffle(components)  # popularity independent of name order
+    cum = _zipf_cum_weights(len(components), zipf)
+    total = cum[-1]
+    methods = {
+        ctype: ([m for m, _ in mix], list(itertools.accumulate(w for _, w in mix)))
+        for ctype, mix in METHOD_MIX.items()
+    }
+
+    end = (end or datetime.now(timezone.utc)).replace(microsecond=0)
+    start = end - timedelta(days=days)
+    span_s = days * 86400
+    # Session sizes are drawn until they cover ``rows`` (the last one is cut
+    # to fit), so no single session soaks up the shortfall
+    sizes = []
+    remaining = rows
+    while remaining > 0:
+        size = min(remaining, max(1, int(rng.expovariate(1 / burst))))
+        sizes.append(size)
+        remaining -= size
+    # Session starts: sorted uniform draws, nudged into working hours
+    session_starts = sorted(rng.random() * span_s for _ in sizes)
+
+    for i, (offset, size) in enumerate(zip(session_starts, sizes)):
+        ts = start + timedelta(seconds=offset)
+        if not 8 <= ts.hour < 20 and rng.random() < 0.6:
+            ts = ts.replace(hour=rng.randint(9, 18))
+        cwd = rng.randint(1, PROJECTS)
+        for _ in range(size):
+            # Never past ``end``: late sessions and working-hours nudges
+            # would otherwise run into the future
+            ts = min(ts + timedelta(seconds=rng.expovariate(1 / 45)), end)
+            name, ctype = components[bisect.bisect(cum, rng.random() * total)]
+            names, mcum = methods[ctype]
+            method = names[bisect.bisect(mcum, rng.random() * mcum[-1])]
+            yield name, ctype, method, ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3], i + 1, cwd
+
+
+def write_activations(db_path: Path, rows_iter) -> int:
+    if db_path.exists():
+        db_path.unlink()
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    ensure_schema(conn, indexes=False)  # Indexes are built after the bulk load
+    count = 0
+    while True:
+        batch = list(itertools.islice(rows_iter, INSERT_BATCH))
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT INTO activations (component_name, component_type, detection_method,"
+            " invoked_at, session_ref, cwd_ref) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        count += len(batch)
+    conn.execute(
+        "INSERT INTO sessions (id, session_id)"
+        " SELECT DISTINCT session_ref, printf('synth-session-%08d', session_ref) FROM activations"
+    )
+    conn.executemany(
+        "INSERT INTO cwds (id, path) VALUES (?, ?)",
+        [(i, f"/synth/project-{i:02d}") for i in range(1, PROJECTS + 1)],
+    )
+    create_indexes(conn)
+    conn.commit()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+    return count
+
+
+def write_transcripts(out_dir: Path, catalog: dict, files: int, lines: int,
+                      skill_share: float, days: int, rng: random.Random,
+                      end: datetime | None = None) -> int:
+    """Write ``files`` JSONL transcripts of ``lines`` rows under project dirs.
+
+    About ``skill_share`` of rows are Skill tool_use events; the rest are
+    filler messages of realistic size. Returns the Skill event count.
+    """
+    skills = [s["name"] for s in catalog["skills"]] or ["synth-skill"]
+    cum = _zipf_cum_weights(len(skills), 1.1)
+    end = end or datetime.now(timezone.utc)
+    filler = "x" * 400
+    events = 0
+    for i in range(files):
+        project = out_dir / f"-synth-project-{i % PROJECTS:02d}"
+        session = {"sessionId": f"synth-transcript-{i:05d}",
+                   "cwd": f"/synth/project-{i % PROJECTS:02d}"}
+        project.mkdir(parents=True, exist_ok=True)
+        ts = end - timedelta(seconds=rng.random() * days * 86400)
+        with (project / f"session-{i:05d}.jsonl").open("w", encoding="utf-8") as fh:
+            for _ in range(lines):
+                ts += timedelta(seconds=rng.expovariate(1 / 20))
+                stamp = ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+                if rng.random() < skill_share:
+                    skill = skills[bisect.bisect(cum, rng.random() * cum[-1])]
+                    row = {"type": "tool_use", "name": "Skill",
+                           "input": {"skill": skill}, "timestamp": stamp, **session}
+                    events += 1
+                else:
+                    row = {"type": "assistant", "timestamp": stamp, **session,
+                           "message": {"role": "assistant", "content": filler}}
+                fh.write(json.dumps(row) + "\n")
+    return events
+
+
+def parse_end(value: str) -> datetime:
+    """ISO date/datetime → aware UTC datetime (naive values are UTC)."""
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {value!r}")
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def generate(out_dir: Path, rows: int, components: int = 5000, plugins: int = 40,
+             days: int = 730, transcripts: int = 200, transcript_lines: int = 500,
+             seed: int = 0, end: datetime | None = None) -> dict:
+    """Write a full dataset into ``out_dir``; returns its manifest."""
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    catalog = make_catalog(components, plugins, rng, end)
+    (out_dir / "catalog.json").write_text(json.dumps(catalog, indent=2), encoding="utf-8")
+    count = write_activations(out_dir / "activations.sqlite",
+                              iter_activations(catalog, rows, days, rng, end=end))
+    skill_events = write_transcripts(out_dir / "transcripts", catalog, transcripts,
+                                     transcript_lines, 0.05, days, rng, end)
+    manifest = {
+        "rows": count,
+        "components": components,
+        "skills": len(catalog["skills"]),
+        "commands": len(catalog["commands"]),
+        "plugins": plugins,
+        "days": days,
+        "transcripts": transcripts,
+        "transcript_lines": transcript_lines,
+        "transcript_skill_events": skill_events,
+        "seed": seed,
+        "end": end.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic SPAM dataset")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--components", type=int, default=5000)
+    parser.add_argument("--plugins", type=int, default=40)
+    parser.add_argument("--days", type=int, default=730, help="History span")
+    parser.add_argument("--transcripts", type=int, default=200, help="Transcript files")
+    parser.add_argument("--transcript-lines", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end", type=parse_end, metavar="TIME",
+                        help="Newest timestamp, ISO (UTC if no offset); default now")
+    args = parser.parse_args(argv)
+
+    manifest = generate(args.out_dir, args.rows, args.components, args.plugins,
+                        args.days, args.transcripts, args.transcript_lines, args.seed,
+                        args.end)
+    json.dump(manifest, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # created: 2026-01-31
-# updated: 2026-02-01
+# updated: 2026-10-19
 # created_by:
 #   github_username: andrew-tomago
 #   agent: Claude Code 2.1.29
@@ -9,15 +9,62 @@
 Hook event capture for SPAM.
 Receives hook JSON on stdin. Records matching activations to SQLite.
 Always exits 0 — never blocks Claude.
+
+Each activation carries the hook payload's session_id, cwd, and
+transcript_path, dictionary-encoded: the strings live once in the
+``sessions``/``cwds`` tables and the row stores integer refs. The schema
+and its migrations live in skills/spam-stats/scripts/spam_schema.py.
+
+Also measures its own overhead per phase (startup, catalog, detect, write)
+and appends a sample to a JSONL spool: every dropped event (lock timeout or
+swallowed exception) plus a random SPAM_METRICS_SAMPLE fraction of the rest.
+Where the OS exposes the process start time (Linux /proc), ``total_ms``
+and ``startup_ms`` include interpreter startup (``clock: "process"``);
+elsewhere they cover only the script after its first line
+(``clock: "script"``).
 """
 from __future__ import annotations
-import json, sys, sqlite3, argparse
+import time
+_T0 = time.perf_counter()
+import json, os, sys, sqlite3, argparse
+from datetime import datetime, timezone
 from pathlib import Path
 
+# Event store schema is shared with the stats scripts
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "skills" / "spam-stats" / "scripts"))
+
 DATA_DIR  = Path.home() / ".claude" / "spam"
 CATALOG   = DATA_DIR / "catalog.json"
 DB_PATH   = DATA_DIR / "activations.sqlite"
 
+METRICS_SPOOL         = DATA_DIR / "hook_metrics.jsonl"
+METRICS_SPOOL_ROTATED = DATA_DIR / "hook_metrics.jsonl.1"
+METRICS_SPOOL_MAX     = 1 << 20  # bytes before rotating to .1
+PHASES                = ("startup", "catalog", "detect", "write")
+DROP_OUTCOMES         = ("lock_timeout", "error")
+
+def sample_rate() -> float:
+    try:
+        return min(max(float(os.environ.get("SPAM_METRICS_SAMPLE", "0.1")), 0.0), 1.0)
+    except ValueError:
+        return 0.1
+
+def process_elapsed() -> float | None:
+    """Seconds since this process started, or None if the OS doesn't say.
+
+    Linux only: /proc/self/stat starttime (clock ticks since boot, so
+    resolution is one tick, typically 10 ms) against CLOCK_BOOTTIME.
+    """
+    try:
+        with open("/proc/self/stat", "rb") as fh:
+            stat = fh.read()
+        # Field 2 (comm) may contain spaces; fields after ')' start at 3
+        starttime = int(stat.rsplit(b")", 1)[1].split()[19])
+        now = time.clock_gettime(time.CLOCK_BOOTTIME)
+        return now - starttime / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
 def load_catalog() -> dict:
     if not CATALOG.exists():
         return {"commands": []}
@@ -53,48 +100,107 @@ def detect(event: dict, catalog: dict) -> dict | None:
 
     return None
 
-def record(match: dict):
+def record(match: dict, event: dict):
+    # Imported here so no_match calls (most of them) skip loading it
+    from spam_schema import ensure_schema, intern
+
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(DB_PATH), timeout=1.0)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA busy_timeout = 500")
+    ensure_schema(conn)
+    session_ref = intern(conn, "sessions", "session_id", event.get("session_id", ""),
+                         transcript_path=event.get("transcript_path") or None)
+    cwd_ref = intern(conn, "cwds", "path", event.get("cwd", ""))
     conn.execute("""
-        CREATE TABLE IF NOT EXISTS activations (
-            id                INTEGER PRIMARY KEY AUTOINCREMENT,
-            component_name    TEXT NOT NULL,
-            component_type    TEXT NOT NULL
-                              CHECK (component_type IN ('skill', 'command')),
-            detection_method  TEXT NOT NULL
-                              CHECK (detection_method IN ('tool_call', 'prompt_match', 'bash_match', 'transcript')),
-            invoked_at        TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
-        )
-    """)
-    conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_activations_time
-            ON activations (invoked_at)
-    """)
-    conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_activations_component
-            ON activations (component_name, component_type)
-    """)
-    conn.execute("""
-        INSERT INTO activations (component_name, component_type, detection_method)
-        VALUES (?, ?, ?)
-    """, [match["name"], match["type"], match["method"]])
+        INSERT INTO activations
+            (component_name, component_type, detection_method, session_ref, cwd_ref)
+        VALUES (?, ?, ?, ?, ?)
+    """, [match["name"], match["type"], match["method"], session_ref, cwd_ref])
     conn.commit()
     conn.close()
 
+def spool_metrics(sample: dict):
+    """Append one JSON line to the metrics spool. O_APPEND, no DB lock."""
+    try:
+        line = (json.dumps(sample, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            if METRICS_SPOOL.stat().st_size > METRICS_SPOOL_MAX:
+                os.replace(METRICS_SPOOL, METRICS_SPOOL_ROTATED)
+        except FileNotFoundError:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(METRICS_SPOOL), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except Exception:
+        pass  # Telemetry must never break tracking
+
+def finish_metrics(event_type: str, outcome: str, timings: dict, error: str = ""):
+    rate = sample_rate()
+    sampled = rate > 0 and int.from_bytes(os.urandom(2), "little") < rate * 65536
+    if not sampled and outcome not in DROP_OUTCOMES:
+        return
+    in_script = time.perf_counter() - _T0
+    elapsed = process_elapsed()
+    if elapsed is not None and elapsed >= in_script:
+        # Interpreter startup before _T0 counts toward the startup phase
+        timings["startup"] = timings.get("startup", 0.0) + elapsed - in_script
+        total, clock = elapsed, "process"
+    else:
+        total, clock = in_script, "script"
+    sample = {
+        "ts": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+        "event": event_type,
+        "outcome": outcome,
+        "sampled": sampled,
+        "rate": rate,
+        "clock": clock,
+        "total_ms": round(total * 1000, 3),
+    }
+    for phase in PHASES:
+        sample[f"{phase}_ms"] = round(timings.get(phase, 0.0) * 1000, 3)
+    if error:
+        sample["error"] = error
+    spool_metrics(sample)
+
 if __name__ == "__main__":
+    timings = {}
+    mark = time.perf_counter()
+    timings["startup"] = mark - _T0
+    event_type, outcome, error = "unknown", "error", ""
     try:
         parser = argparse.ArgumentParser()
         parser.add_argument("--event", required=True)
         args = parser.parse_args()
+        event_type = args.event
 
         event = json.loads(sys.stdin.read())
+        if event.get("tool_name"):
+            event_type = f"{args.event}:{event['tool_name']}"
+        mark = time.perf_counter()
         catalog = load_catalog()
+        timings["catalog"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
         match = detect(event, catalog)
+        timings["detect"] = time.perf_counter() - mark
         if match:
-            record(match)
-    except Exception:
-        pass  # Silent failure — never block Claude
+            mark = time.perf_counter()
+            try:
+                record(match, event)
+            finally:
+                timings["write"] = time.perf_counter() - mark
+            outcome = "recorded"
+        else:
+            outcome = "no_match"
+    except sqlite3.OperationalError as exc:
+        # busy_timeout expired: the activation is lost
+        msg = str(exc).lower()
+        outcome = "lock_timeout" if "locked" in msg or "busy" in msg else "error"
+        error = type(exc).__name__
+    except Exception as exc:
+        error = type(exc).__name__  # Silent failure — never block Claude
+    finish_metrics(event_type, outcome, timings, error)
     sys.exit(0)
@@ -1,20 +1,46 @@
 #!/usr/bin/env python3
 # created: 2026-01-31
+# updated: 2026-10-19
 # created_by:
 #   agent: Claude Code 2.1.29
 #   model: claude-opus-4-5-20251101
 """
 Markdown table renderer for the SPAM catalog.
-Reads catalog.json and outputs a grouped, scannable table per source.
+Reads catalog.index.json (written by catalog-builder.py alongside
+catalog.json) and outputs a grouped, scannable table per source.
+
+Filters (--source GLOB, --lifecycle, --model, --scope, --type) are answered
+from the index's source sections and posting lists, and --limit/--offset
+page through the matches; sections are streamed as they are reached, so
+nothing outside the page is formatted.
+
+``--format json|jsonl|csv|arrow`` streams one row per matching entry
+instead, in the same (source, name) order, for dashboards and downstream
+tools.
 """
+from __future__ import annotations
+
+import argparse
 import json
 import sys
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
+# Shared helpers live with the spam-stats scripts
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "spam-stats" / "scripts"))
+from catalog_index import ENTRY_COLUMNS, build_index, load_index, query  # noqa: E402
+from row_output import write_arrow, write_rows  # noqa: E402
+from spam_trace import span, traced  # noqa: E402
+
 CATALOG_PATH = Path.home() / ".claude" / "spam" / "catalog.json"
+INDEX_PATH = CATALOG_PATH.with_name("catalog.index.json")
+
+FORMATS = ("markdown", "json", "jsonl", "csv", "arrow")
+FILTERS = ("source", "lifecycle", "model", "scope", "component_type")
 
 
+@traced()
 def load_catalog() -> dict:
     if not CATALOG_PATH.is_file():
         print("Catalog not found — run catalog-builder.py first", file=sys.stderr)
@@ -22,55 +48,111 @@ def load_catalog() -> dict:
     return json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
 
 
-def merge_entries(catalog: dict) -> list[dict]:
-    """Merge skills and commands into a unified list, dedup by (name, source)."""
-    seen: set = set()
-    merged: list = []
-    for item in catalog.get("skills", []) + catalog.get("commands", []):
-        key = (item["name"], item["source"])
-        if key in seen:
+@traced("load_index")
+def load_catalog_index() -> dict:
+    """The persisted index, or one built in memory if it is missing or stale."""
+    index = load_index(INDEX_PATH, CATALOG_PATH)
+    if index is None:
+        index = build_index(load_catalog())
+    return index
+
+
+def iter_markdown(index: dict, positions, offset: int = 0, limit: int | None = None,
+                  filters: dict | None = None):
+    """Yield markdown lines for one page of ``positions``.
+
+    Rows before ``offset`` or past ``limit`` are only counted (for the
+    footer), never formatted.
+    """
+    entries = index["entries"]
+    yield "# SPAM — Installed Skills & Commands"
+    yield ""
+    yield f"_Generated: {index.get('generated_at', 'unknown')}_"
+    if filters:
+        yield ""
+        yield "_Filters: " + ", ".join(f"{k}={v}" for k, v in filters.items()) + "_"
+
+    total = shown = 0
+    sources: set = set()
+    current = None
+    for pos in positions:
+        entry = entries[pos]
+        total += 1
+        sources.add(entry["source"])
+        if total <= offset or (limit is not None and shown >= limit):
             continue
-        seen.add(key)
-        merged.append(item)
-    return merged
-
-
-def render(catalog: dict) -> str:
-    entries = merge_entries(catalog)
-    by_source: dict[str, list[dict]] = {}
-    for e in entries:
-        by_source.setdefault(e["source"], []).append(e)
-
-    lines: list[str] = []
-    generated = catalog.get("generated_at", "unknown")
-    lines.append("# SPAM — Installed Skills & Commands")
-    lines.append("")
-    lines.append(f"_Generated: {generated}_")
-
-    total = 0
-    for source in sorted(by_source):
-        items = sorted(by_source[source], key=lambda x: x["name"])
-        total += len(items)
-        lines.append("")
-        lines.append(f"## {source}")
-        lines.append("")
-        lines.append("| Name | Scope | Lifecycle | Model |")
-        lines.append("|------|-------|-----------|-------|")
-        for item in items:
-            name = item.get("name", "")
-            scope = item.get("scope", "")
-            lifecycle = item.get("lifecycle", "")
-            model = item.get("model", "")
-            lines.append(f"| {name} | {scope} | {lifecycle} | {model} |")
-
-    lines.append("")
-    lines.append(f"**Total:** {total} entries across {len(by_source)} sources")
-    return "\n".join(lines)
-
-
-def main():
-    catalog = load_catalog()
-    print(render(catalog))
+        if entry["source"] != current:
+            current = entry["source"]
+            yield ""
+            yield f"## {current}"
+            yield ""
+            yield "| Name | Scope | Lifecycle | Model |"
+            yield "|------|-------|-----------|-------|"
+        yield f"| {entry['name']} | {entry['scope']} | {entry['lifecycle']} | {entry['model']} |"
+        shown += 1
+
+    yield ""
+    if offset or limit is not None:
+        first = offset + 1 if shown else 0
+        yield (f"**Showing:** {first}–{offset + shown} of {total} entries "
+               f"across {len(sources)} sources")
+    else:
+        yield f"**Total:** {total} entries across {len(sources)} sources"
+
+
+@traced()
+def render(catalog: dict, offset: int = 0, limit: int | None = None, **filters) -> str:
+    """Render a catalog dict as one markdown document (indexes it first)."""
+    index = build_index(catalog)
+    return "\n".join(iter_markdown(index, query(index, **filters), offset, limit, filters))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Render the SPAM catalog")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="markdown",
+        help="Output format (default: markdown)",
+    )
+    parser.add_argument("--source", metavar="GLOB",
+                        help="Only entries whose source matches GLOB (e.g. 'plugin:*')")
+    parser.add_argument("--lifecycle", help="Only entries in this lifecycle (active, passive, dev)")
+    parser.add_argument("--model", help="Only entries pinned to this model ('' for none)")
+    parser.add_argument("--scope", help="Only entries installed in this scope (user, project)")
+    parser.add_argument("--type", dest="component_type", choices=("skill", "command"),
+                        help="Only skills or only commands")
+    parser.add_argument("--limit", type=int, metavar="N", help="Show at most N entries")
+    parser.add_argument("--offset", type=int, default=0, metavar="N",
+                        help="Skip the first N matching entries (default: 0)")
+    args = parser.parse_args(argv)
+    if args.offset < 0 or (args.limit is not None and args.limit < 0):
+        parser.error("--limit and --offset must be non-negative")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    filters = {key: getattr(args, key) for key in FILTERS if getattr(args, key) is not None}
+    index = load_catalog_index()
+    positions = query(index, **filters)
+
+    if args.format == "markdown":
+        with span("render"):
+            out = sys.stdout
+            for line in iter_markdown(index, positions, args.offset, args.limit, filters):
+                out.write(line + "\n")
+        return
+
+    stop = None if args.limit is None else args.offset + args.limit
+    entries = index["entries"]
+    rows = (entries[pos] for pos in islice(positions, args.offset, stop))
+    if args.format == "arrow":
+        with span("write_arrow"):
+            write_arrow(rows, ENTRY_COLUMNS)
+    else:
+        with span("write_rows", format=args.format):
+            write_rows(rows, args.format, ENTRY_COLUMNS)
 
 
 if __name__ == "__main__":
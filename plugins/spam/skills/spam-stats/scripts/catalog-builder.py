@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 # created: 2026-01-31
+# updated: 2026-10-19
 # created_by:
 #   agent: Claude Code 2.1.29
 #   model: claude-opus-4-5-20251101
 """
 Catalog builder for SPAM.
 Scans filesystem for installed Claude Code skills and commands.
-Outputs catalog.json for use by track.py and spam-stats.py.
+Outputs catalog.json for use by track.py and spam-stats.py, plus
+catalog.index.json (see catalog_index) for format-catalog.py queries.
 """
+import hashlib
 import json
 import os
 import re
@@ -15,8 +18,12 @@ import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
+from catalog_index import build_index, catalog_stat, write_index
+from spam_trace import span, traced
+
 DATA_DIR = Path.home() / ".claude" / "spam"
 CATALOG_PATH = DATA_DIR / "catalog.json"
+INDEX_PATH = DATA_DIR / "catalog.index.json"
 
 LIFECYCLE_DIRS = {
     "active": "active",
@@ -169,6 +176,7 @@ def scan_commands(base: Path, source: str, scope: str = "") -> list:
     return entries
 
 
+@traced()
 def discover_plugins() -> list:
     """Return list of ``(plugin_root, plugin_name, scopes)`` tuples.
 
@@ -271,30 +279,76 @@ def _dedup(items: list, key_fields: tuple) -> list:
     return out
 
 
-def build_catalog() -> dict:
-    """Assemble full catalog from all scan targets."""
-    skills: list = []
-    commands: list = []
-
+def scan_targets() -> list:
+    """Return ``(skills_dir, commands_dir, source, scope)`` for every scan root."""
     home = Path.home()
+    targets = [(home / ".claude" / "skills", home / ".claude" / "commands", "user", "user")]
 
-    # 1. User-scoped
-    skills.extend(scan_skills(home / ".claude" / "skills", "user", scope="user"))
-    commands.extend(scan_commands(home / ".claude" / "commands", "user", scope="user"))
-
-    # 2. Project-scoped
     project_dir = os.environ.get("CLAUDE_PROJECT_DIR")
     if project_dir:
-        p = Path(project_dir)
-        skills.extend(scan_skills(p / ".claude" / "skills", "project", scope="project"))
-        commands.extend(scan_commands(p / ".claude" / "commands", "project", scope="project"))
+        p = Path(project_dir) / ".claude"
+        targets.append((p / "skills", p / "commands", "project", "project"))
 
-    # 3. Plugins
     for plugin_root, plugin_name, scopes in discover_plugins():
-        source = f"plugin:{plugin_name}"
         scope_str = ", ".join(sorted(scopes)) if scopes else ""
-        skills.extend(scan_skills(plugin_root / "skills", source, scope=scope_str))
-        commands.extend(scan_commands(plugin_root / "commands", source, scope=scope_str))
+        targets.append((
+            plugin_root / "skills",
+            plugin_root / "commands",
+            f"plugin:{plugin_name}",
+            scope_str,
+        ))
+    return targets
+
+
+def _tree_signature(base: Path, digest) -> None:
+    """Feed (path, mtime, size) of ``base``'s directories and ``.md`` files."""
+    if not base.is_dir():
+        digest.update(f"{base}:missing\n".encode())
+        return
+    for root, dirs, files in os.walk(base, followlinks=True):
+        dirs.sort()
+        for name in [""] + sorted(f for f in files if f.endswith(".md")):
+            path = os.path.join(root, name) if name else root
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{path}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+
+
+@traced()
+def catalog_fingerprint() -> str:
+    """Stat-only hash of every catalog input: plugin manifest and scan trees.
+
+    Changes whenever ``build_catalog()`` could produce a different result,
+    without reading or parsing any frontmatter.
+    """
+    digest = hashlib.sha1()
+    plugins_dir = Path.home() / ".claude" / "plugins"
+    for path in (plugins_dir / "installed_plugins.json", plugins_dir / "cache"):
+        try:
+            st = path.stat()
+            digest.update(f"{path}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+        except OSError:
+            digest.update(f"{path}:missing\n".encode())
+    for skills_dir, commands_dir, source, scope in scan_targets():
+        digest.update(f"{source}|{scope}\n".encode())
+        _tree_signature(skills_dir, digest)
+        _tree_signature(commands_dir, digest)
+    return digest.hexdigest()
+
+
+@traced()
+def build_catalog() -> dict:
+    """Assemble full catalog from all scan targets."""
+    skills: list = []
+    commands: list = []
+
+    # User-scoped, project-scoped, then plugins
+    for skills_dir, commands_dir, source, scope in scan_targets():
+        with span("scan", source=source):
+            skills.extend(scan_skills(skills_dir, source, scope=scope))
+            commands.extend(scan_commands(commands_dir, source, scope=scope))
 
     # De-duplicate
     skills = _dedup(skills, ("name", "source"))
@@ -307,10 +361,17 @@ def build_catalog() -> dict:
     }
 
 
-def main():
+def write_catalog(catalog: dict) -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with span("write_catalog"):
+        CATALOG_PATH.write_text(json.dumps(catalog, indent=2), encoding="utf-8")
+    with span("write_index"):
+        write_index(build_index(catalog, catalog_stat(CATALOG_PATH)), INDEX_PATH)
+
+
+def main():
     catalog = build_catalog()
-    CATALOG_PATH.write_text(json.dumps(catalog, indent=2), encoding="utf-8")
+    write_catalog(catalog)
     print(f"Catalog: {len(catalog['skills'])} skills, {len(catalog['commands'])} commands")
     print(f"Written to {CATALOG_PATH}")
 
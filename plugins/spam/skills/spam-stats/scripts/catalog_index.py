@@ -0,0 +1,138 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Secondary indexes over the SPAM catalog.
+catalog-builder.py writes ``catalog.index.json`` next to ``catalog.json``:
+
+    entries    deduplicated rows, pre-sorted by (source, name) — render order
+    sections   source → [start, end) range into entries
+    postings   lifecycle / model / scope / type → ascending entry positions
+
+format-catalog.py answers filtered, paginated queries from it without
+merging, grouping, or sorting the catalog. The index records the stat of
+the catalog it was built from; a stale or missing index is rebuilt in
+memory. Stdlib only.
+"""
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+INDEX_VERSION = 1
+ENTRY_COLUMNS = ("name", "type", "source", "scope", "lifecycle", "model", "description")
+POSTING_FIELDS = ("lifecycle", "model", "scope", "type")
+
+
+def catalog_stat(catalog_path: Path) -> list | None:
+    try:
+        st = catalog_path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def scope_tokens(scope: str) -> list[str]:
+    """``"user, project"`` → ``["user", "project"]``."""
+    return [s.strip() for s in scope.split(",") if s.strip()]
+
+
+def build_index(catalog: dict, stat: list | None = None) -> dict:
+    """Flatten skills then commands (dedup by (name, source)) into an index."""
+    seen: set = set()
+    entries: list[dict] = []
+    for kind, items in (("skill", catalog.get("skills", [])),
+                        ("command", catalog.get("commands", []))):
+        for item in items:
+            key = (item["name"], item["source"])
+            if key in seen:
+                continue
+            seen.add(key)
+            row = {col: item.get(col, "") for col in ENTRY_COLUMNS}
+            row["type"] = kind
+            entries.append(row)
+    entries.sort(key=lambda e: (e["source"], e["name"]))
+
+    sections: dict[str, list[int]] = {}
+    postings: dict[str, dict[str, list[int]]] = {field: {} for field in POSTING_FIELDS}
+    for pos, entry in enumerate(entries):
+        section = sections.setdefault(entry["source"], [pos, pos])
+        section[1] = pos + 1
+        for field in ("lifecycle", "model", "type"):
+            postings[field].setdefault(entry[field], []).append(pos)
+        for token in scope_tokens(entry["scope"]):
+            postings["scope"].setdefault(token, []).append(pos)
+
+    return {
+        "version": INDEX_VERSION,
+        "generated_at": catalog.get("generated_at", "unknown"),
+        "catalog_stat": stat,
+        "entries": entries,
+        "sections": sections,
+        "postings": postings,
+    }
+
+
+def write_index(index: dict, index_path: Path):
+    tmp = index_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, index_path)
+
+
+def load_index(index_path: Path, catalog_path: Path) -> dict | None:
+    """Return the persisted index, or None if missing or stale."""
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    if index.get("catalog_stat") != catalog_stat(catalog_path):
+        return None
+    return index
+
+
+def query(
+    index: dict,
+    source: str | None = None,
+    lifecycle: str | None = None,
+    model: str | None = None,
+    scope: str | None = None,
+    component_type: str | None = None,
+):
+    """Yield matching entry positions in render order.
+
+    ``source`` may be a glob. The source sections bound the scan; the
+    shortest remaining posting list drives it and the others are probed.
+    """
+    postings = index["postings"]
+    wanted = [
+        postings[field].get(value, [])
+        for field, value in (("lifecycle", lifecycle), ("model", model),
+                             ("scope", scope), ("type", component_type))
+        if value is not None
+    ]
+    if source is None:
+        ranges = [(0, len(index["entries"]))]
+    else:
+        ranges = sorted(
+            tuple(bounds) for name, bounds in index["sections"].items()
+            if fnmatchcase(name, source)
+        )
+    if not wanted:
+        for start, end in ranges:
+            yield from range(start, end)
+        return
+
+    wanted.sort(key=len)
+    driver, probes = wanted[0], [set(p) for p in wanted[1:]]
+    for start, end in ranges:
+        for i in range(bisect_left(driver, start), len(driver)):
+            pos = driver[i]
+            if pos >= end:
+                break
+            if all(pos in p for p in probes):
+                yield pos
@@ -0,0 +1,96 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Hook overhead summary for SPAM.
+Reads the metrics spool written by track.py and reports, per event type,
+p50/p95/p99 time per hook call and the fraction of events dropped (lock
+timeouts, swallowed exceptions). Stdlib only.
+
+Rows are split by clock: ``process`` samples are measured from process
+start (interpreter startup included); ``in-script`` samples — platforms
+without a process start time, and spools from older track.py — only from
+the script's first line, so they understate the real per-call cost.
+
+Percentiles use sampled rows only. Event totals are estimated from samples
+(each weighs 1/rate); drops are exact because track.py always spools them.
+"""
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+
+DROP_OUTCOMES = ("lock_timeout", "error")
+
+CLOCK_LABELS = {"process": "process", "script": "in-script"}
+
+OVERHEAD_COLS = [
+    ("Event", "event", 25),
+    ("Clock", "clock", 9),
+    ("Samples", "samples", 8),
+    ("p50 ms", "p50_ms", 8),
+    ("p95 ms", "p95_ms", 8),
+    ("p99 ms", "p99_ms", 8),
+    ("Drops", "drops", 6),
+    ("Drop %", "drop_pct", 7),
+]
+
+
+def iter_samples(paths: list[Path]):
+    """Yield spool records, oldest file first; skips unreadable lines."""
+    for path in paths:
+        try:
+            fh = path.open(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        with fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def percentile(sorted_vals: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (``q`` in 0..100)."""
+    if not sorted_vals:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_vals)))
+    return sorted_vals[min(rank, len(sorted_vals)) - 1]
+
+
+def summarize(samples) -> list[dict]:
+    """Aggregate spool records into one row per (event type, clock)."""
+    by_event: dict[tuple[str, str], dict] = {}
+    for s in samples:
+        clock = CLOCK_LABELS.get(s.get("clock", "script"), "in-script")
+        agg = by_event.setdefault(
+            (s.get("event", "unknown"), clock),
+            {"totals": [], "estimated": 0.0, "drops": 0, "errors": 0},
+        )
+        if s.get("outcome") in DROP_OUTCOMES:
+            agg["drops"] += 1
+            if s.get("outcome") == "error":
+                agg["errors"] += 1
+        if s.get("sampled"):
+            agg["totals"].append(float(s.get("total_ms", 0.0)))
+            rate = s.get("rate") or 1.0
+            agg["estimated"] += 1.0 / rate
+
+    rows = []
+    for (event, clock), agg in sorted(by_event.items()):
+        totals = sorted(agg["totals"])
+        estimated = max(agg["estimated"], float(agg["drops"]))
+        rows.append({
+            "event": event,
+            "clock": clock,
+            "samples": len(totals),
+            "p50_ms": percentile(totals, 50),
+            "p95_ms": percentile(totals, 95),
+            "p99_ms": percentile(totals, 99),
+            "drops": agg["drops"],
+            "errors": agg["errors"],
+            "drop_pct": 100.0 * agg["drops"] / estimated if estimated else 0.0,
+        })
+    return rows
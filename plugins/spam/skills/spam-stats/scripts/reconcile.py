@@ -1,12 +1,24 @@
 #!/usr/bin/env python3
 # created: 2026-01-31
+# updated: 2026-10-19
 # created_by:
 #   agent: Claude Code 2.1.27
 #   model: claude-opus-4-5-20251101
 """
 Transcript reconciliation for SPAM.
 Finds skill activations in session transcripts not captured by hooks.
-Backfills into activations with detection_method = 'transcript'.
+Backfills into activations with detection_method = 'transcript', with the
+row's sessionId/cwd and the transcript path dictionary-encoded like track.py.
+
+Incremental: a per-file checkpoint (size, mtime, byte offset, device and
+inode) is kept in ``reconcile_checkpoints``; unchanged transcripts are
+skipped by stat alone and appended ones are read from the last complete
+line onward. A path that now names a different file (rotated and
+recreated) is read from the start.
+
+Archived transcripts (``.jsonl.gz``/``.bz2``/``.xz``, and rotated
+``.jsonl.N``) are read too. Compressed files are stream-decompressed once
+and checkpointed as fully processed; they are re-read only if replaced.
 
 Stdlib only — no pip dependencies.
 """
@@ -14,78 +26,267 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import sqlite3
 import sys
+import zlib
 from datetime import datetime, timezone
 from pathlib import Path
 
+from session_rollups import refresh as refresh_rollups
+from spam_schema import ensure_schema, intern
+from spam_trace import span, traced
+
 DATA_DIR = Path.home() / ".claude" / "spam"
 DB_PATH = DATA_DIR / "activations.sqlite"
 TRANSCRIPT_DIR = Path(
     os.environ.get("SPAM_TRANSCRIPT_DIR", str(Path.home() / ".claude" / "projects"))
 )
+CHUNK_SIZE = 1 << 20
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz")
+_TRANSCRIPT_NAME = re.compile(r"\.jsonl(\.\d+)?$")
+
+try:
+    from lzma import LZMAError
+except ImportError:  # Python built without liblzma
+    LZMAError = OSError
+# Unreadable file or truncated/corrupt archive. gzip.BadGzipFile and bz2's
+# errors are OSError subclasses; zlib and lzma raise their own.
+READ_ERRORS = (OSError, EOFError, zlib.error, LZMAError)
 
 # TODO: Verify transcript directory path empirically. The actual location may
 # differ from ~/.claude/projects/ — check ~/.claude/logs/ as an alternative.
 
 
-def extract_skill_events(transcript_dir: Path) -> list[dict]:
-    """Pull Skill tool_use events from JSONL transcripts."""
-    events: list[dict] = []
-    if not transcript_dir.is_dir():
-        return events
+def connect() -> sqlite3.Connection:
+    """Open the event store for writing, with the checkpoint table in place."""
+    conn = sqlite3.connect(str(DB_PATH), timeout=1.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout = 500")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reconcile_checkpoints (
+            path      TEXT PRIMARY KEY,
+            size      INTEGER NOT NULL,
+            mtime_ns  INTEGER NOT NULL,
+            offset    INTEGER NOT NULL,
+            dev       INTEGER,
+            ino       INTEGER
+        )
+    """)
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(reconcile_checkpoints)")}
+    for col in ("dev", "ino"):
+        if col not in cols:
+            # Checkpoints from before file identity was kept: NULL, so each
+            # of those transcripts is re-read once (backfill deduplicates)
+            conn.execute(f"ALTER TABLE reconcile_checkpoints ADD COLUMN {col} INTEGER")
+    ensure_schema(conn)
+    return conn
+
+
+def load_checkpoints(conn: sqlite3.Connection) -> dict:
+    """Return ``{path: (size, mtime_ns, offset, dev, ino)}`` for every seen transcript."""
+    rows = conn.execute(
+        "SELECT path, size, mtime_ns, offset, dev, ino FROM reconcile_checkpoints"
+    ).fetchall()
+    return {path: tuple(cp) for path, *cp in rows}
+
+
+def save_checkpoints(conn: sqlite3.Connection, checkpoints: dict):
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO reconcile_checkpoints (path, size, mtime_ns, offset, dev, ino)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [(path, *cp) for path, cp in checkpoints.items()],
+    )
 
-    for f in sorted(transcript_dir.rglob("*.jsonl")):
+
+def compression(path: Path) -> str:
+    """Return the compression suffix (``.gz``, ``.bz2``, ``.xz``) or ``""``."""
+    return path.suffix if path.suffix in COMPRESSED_SUFFIXES else ""
+
+
+def is_transcript(path: Path) -> bool:
+    """Match ``x.jsonl``, rotated ``x.jsonl.1``, and either one compressed."""
+    name = path.name
+    codec = compression(path)
+    if codec:
+        name = name[: -len(codec)]
+    return bool(_TRANSCRIPT_NAME.search(name))
+
+
+def list_transcripts(transcript_dir: Path) -> list[Path]:
+    with span("glob_transcripts"):
+        return sorted(
+            f for f in transcript_dir.rglob("*.jsonl*") if is_transcript(f) and f.is_file()
+        )
+
+
+def open_transcript(path: Path):
+    """Open a transcript as a binary stream, decompressing on the fly."""
+    codec = compression(path)
+    if codec == ".gz":
+        import gzip
+        return gzip.open(path, "rb")
+    if codec == ".bz2":
+        import bz2
+        return bz2.open(path, "rb")
+    if codec == ".xz":
+        import lzma
+        return lzma.open(path, "rb")
+    return path.open("rb")
+
+
+def pending_transcripts(files: list[Path], checkpoints: dict) -> list[tuple]:
+    """Return ``(path, stat, start_offset)`` for files changed since their checkpoint.
+
+    A file that shrank (rewritten) or is no longer the file the checkpoint
+    was taken on (different device/inode: rotated away and recreated, even
+    if it has since grown past the old offset) restarts from offset 0, as
+    does any changed compressed file — offsets into it are not seekable.
+    """
+    pending = []
+    for f in files:
         try:
-            text = f.read_text(encoding="utf-8", errors="replace")
+            st = f.stat()
         except OSError:
             continue
+        cp = checkpoints.get(str(f))
+        same_file = cp is not None and cp[3:] == (st.st_dev, st.st_ino)
+        if same_file and cp[0] == st.st_size and cp[1] == st.st_mtime_ns:
+            continue
+        offset = cp[2] if same_file and cp[2] <= st.st_size and not compression(f) else 0
+        pending.append((f, st, offset))
+    return pending
+
+
+def iter_lines(fh, offset: int = 0, chunk_size: int = CHUNK_SIZE):
+    """Yield ``(line_bytes, end_offset)`` for each complete line after ``offset``.
+
+    Reads fixed-size chunks from a binary file object. A trailing line with
+    no newline is yielded with ``end_offset = None`` — the writer may still
+    be appending to it, so it must not advance a checkpoint.
+    """
+    pos = offset
+    buf = b""
+    while True:
+        chunk = fh.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", start)
+            if nl == -1:
+                break
+            pos += nl + 1 - start
+            yield buf[start:nl], pos
+            start = nl + 1
+        buf = buf[start:]
+    if buf:
+        yield buf, None
+
+
+def _scan_lines(lines, events: list[dict], transcript_path: str | None = None) -> int | None:
+    """Append Skill tool_use events from ``iter_lines`` output.
+
+    Returns the offset just past the last complete line (None if none).
+    """
+    end = None
+    for raw, line_end in lines:
+        if line_end is not None:
+            end = line_end
+        line = raw.decode("utf-8", errors="replace")
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+        # Standard Skill tool_use events
+        if row.get("type") == "tool_use" and row.get("name") == "Skill":
+            skill_name = row.get("input", {}).get("skill", "")
+            if skill_name:
+                events.append({
+                    "name": skill_name,
+                    "timestamp": row.get(
+                        "timestamp",
+                        datetime.now(timezone.utc).isoformat(),
+                    ),
+                    "session_id": row.get("sessionId"),
+                    "cwd": row.get("cwd"),
+                    "transcript_path": transcript_path,
+                })
+
+        # TODO: Add detection pattern for preloaded skill injection
+        # once transcript format is verified empirically.
+    return end
+
+
+@traced()
+def extract_skill_events(transcript_dir: Path, checkpoints: dict | None = None) -> list[dict]:
+    """Pull Skill tool_use events from JSONL transcripts.
+
+    With ``checkpoints`` (see ``load_checkpoints``), only bytes past each
+    file's checkpoint are read and the dict is updated in place.
+    """
+    events: list[dict] = []
+    if not transcript_dir.is_dir():
+        return events
 
-        for line in text.splitlines():
-            if not line.strip():
-                continue
+    files = list_transcripts(transcript_dir)
+    if checkpoints is None:
+        todo = [(f, None, 0) for f in files]
+    else:
+        todo = pending_transcripts(files, checkpoints)
+
+    for f, st, offset in todo:
+        codec = compression(f)
+        with span("transcript", file=f.name, offset=offset):
             try:
-                row = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            # Standard Skill tool_use events
-            if row.get("type") == "tool_use" and row.get("name") == "Skill":
-                skill_name = row.get("input", {}).get("skill", "")
-                if skill_name:
-                    events.append({
-                        "name": skill_name,
-                        "timestamp": row.get(
-                            "timestamp",
-                            datetime.now(timezone.utc).isoformat(),
-                        ),
-                    })
-
-            # TODO: Add detection pattern for preloaded skill injection
-            # once transcript format is verified empirically.
+                with open_transcript(f) as fh:
+                    if offset:
+                        fh.seek(offset)
+                    end = _scan_lines(iter_lines(fh, offset), events, str(f))
+            except READ_ERRORS:
+                # Plain files are retried next run; a bad archive only once
+                # it is replaced.
+                if not codec:
+                    continue
+        if checkpoints is not None:
+            if codec:
+                # Archives are complete: mark the whole file processed
+                end = st.st_size
+            checkpoints[str(f)] = (st.st_size, st.st_mtime_ns,
+                                   end if end is not None else offset, st.st_dev, st.st_ino)
 
     return events
 
 
-def backfill(events: list[dict]) -> int:
+@traced()
+def backfill(events: list[dict], conn: sqlite3.Connection | None = None) -> int:
     """Insert events that lack a matching row in activations.
 
+    Uses ``conn`` if given (left open), otherwise opens its own.
     Returns count of backfilled rows.
     """
-    conn = sqlite3.connect(str(DB_PATH), timeout=1.0)
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout = 500")
+    own = conn is None
+    if own:
+        conn = connect()
 
     inserted = 0
     for ev in events:
-        # Deduplicate: check for existing record within a 1-second window
+        # Deduplicate: check for existing record within a 1-second window.
+        # Normalize to track.py's invoked_at format so the text comparison
+        # lines up ('T' separator, milliseconds).
         count = conn.execute(
             """
             SELECT COUNT(*) FROM activations
             WHERE component_name = ?
               AND component_type = 'skill'
-              AND invoked_at BETWEEN datetime(?, '-1 second')
-                                 AND datetime(?, '+1 second')
+              AND invoked_at BETWEEN strftime('%Y-%m-%dT%H:%M:%f', ?, '-1 second')
+                                 AND strftime('%Y-%m-%dT%H:%M:%f', ?, '+1 second')
             """,
             [ev["name"], ev["timestamp"], ev["timestamp"]],
         ).fetchone()[0]
@@ -94,18 +295,43 @@ def backfill(events: list[dict]) -> int:
             conn.execute(
                 """
                 INSERT INTO activations
-                    (component_name, component_type, detection_method, invoked_at)
-                VALUES (?, 'skill', 'transcript', ?)
+                    (component_name, component_type, detection_method, invoked_at,
+                     session_ref, cwd_ref)
+                VALUES (?, 'skill', 'transcript',
+                        COALESCE(strftime('%Y-%m-%dT%H:%M:%f', ?), ?), ?, ?)
                 """,
-                [ev["name"], ev["timestamp"]],
+                [ev["name"], ev["timestamp"], ev["timestamp"],
+                 intern(conn, "sessions", "session_id", ev.get("session_id"),
+                        transcript_path=ev.get("transcript_path")),
+                 intern(conn, "cwds", "path", ev.get("cwd"))],
             )
             inserted += 1
 
     conn.commit()
-    conn.close()
+    if own:
+        conn.close()
     return inserted
 
 
+def reconcile(conn: sqlite3.Connection, transcript_dir: Path = TRANSCRIPT_DIR) -> tuple[int, int]:
+    """Scan changed transcripts, backfill, advance checkpoints, and fold
+    new activations into the session rollups.
+
+    Returns ``(events_found, rows_inserted)``.
+    """
+    checkpoints = load_checkpoints(conn)
+    events = extract_skill_events(transcript_dir, checkpoints)
+    inserted = backfill(events, conn=conn) if events else 0
+    save_checkpoints(conn, checkpoints)
+    conn.commit()
+    try:
+        with span("rollup_refresh"):
+            refresh_rollups(conn)
+    except sqlite3.OperationalError:
+        pass  # Write lock busy — the next reconcile or spam.py run catches up
+    return len(events), inserted
+
+
 def main():
     if not DB_PATH.exists():
         print("No activation database — nothing to reconcile.")
@@ -114,13 +340,15 @@ def main():
         print(f"Transcript dir not found: {TRANSCRIPT_DIR}")
         return
 
-    events = extract_skill_events(TRANSCRIPT_DIR)
-    if not events:
-        print("No transcript events found.")
+    conn = connect()
+    try:
+        found, inserted = reconcile(conn, TRANSCRIPT_DIR)
+    finally:
+        conn.close()
+    if not found:
+        print("No new transcript events found.")
         return
-
-    inserted = backfill(events)
-    print(f"Reconciled: {len(events)} transcript events, {inserted} backfilled.")
+    print(f"Reconciled: {found} transcript events, {inserted} backfilled.")
 
 
 if __name__ == "__main__":
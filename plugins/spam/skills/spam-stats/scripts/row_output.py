@@ -0,0 +1,79 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Row output for SPAM scripts.
+Shared by spam-stats.py and format-catalog.py for their ``--format``
+json/jsonl/csv/arrow modes: rows are written as they arrive, never
+collected first. pyarrow is optional and only imported for arrow output.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import sys
+
+ARROW_BATCH_SIZE = 1024
+
+
+def require_pyarrow():
+    """Import pyarrow (with IPC) or exit with install instructions."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        print(
+            "Error: pyarrow not installed (required for --format arrow).\n"
+            "Run with: uv run --with pyarrow --script <this-script>\n"
+            "Or install manually: pip install pyarrow\n",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return pyarrow
+
+
+def write_rows(rows, fmt: str, columns: tuple, out=None) -> int:
+    """Stream dict rows to ``out`` as json, jsonl, or csv. Returns row count."""
+    out = out or sys.stdout
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(row, default=str) + "\n")
+            count += 1
+    elif fmt == "json":
+        out.write("[")
+        for row in rows:
+            out.write(",\n  " if count else "\n  ")
+            out.write(json.dumps(row, default=str))
+            count += 1
+        out.write("\n]\n" if count else "]\n")
+    else:
+        raise ValueError(f"unsupported row format: {fmt}")
+    out.flush()
+    return count
+
+
+def write_arrow(rows, columns: tuple, out=None) -> int:
+    """Stream dict rows of strings as an Arrow IPC stream in fixed-size batches."""
+    pa = require_pyarrow()
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    sink = out or sys.stdout.buffer
+    count = 0
+    with pa.ipc.new_stream(sink, schema) as writer:
+        batch: list = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= ARROW_BATCH_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
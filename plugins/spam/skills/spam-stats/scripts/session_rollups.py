@@ -0,0 +1,247 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Session rollups for SPAM.
+Materializes per-session summaries and a sparse component co-occurrence
+table in ``activations.sqlite``, maintained incrementally from an ``id``
+watermark in ``rollup_state``:
+
+    session_components  (session, component) → activations
+    session_summary     session → activations, components, first/last seen
+    co_usage            component pair → sessions in which both were used
+
+Each refresh reads only activations past the watermark, in ``id`` chunks so
+the write lock is held briefly. Pairs are counted once per session, when a
+component first appears in it: new × already-seen plus new × new.
+Activations without a session (recorded before capture existed) are skipped.
+Stdlib only.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from hook_overhead import percentile
+from spam_schema import ensure_schema
+
+ROLLUP_CHUNK = 50_000
+
+PAIR_COLS = [
+    ("Component", "a_name", 25),
+    ("Type", "a_type", 8),
+    ("Used with", "b_name", 25),
+    ("Type", "b_type", 8),
+    ("Sessions", "sessions", 9),
+    ("% sessions", "pct_sessions", 10),
+]
+SESSION_COLS = [
+    ("Per session", "metric", 22),
+    ("Sessions", "sessions", 9),
+    ("Mean", "mean", 8),
+    ("p50", "p50", 8),
+    ("p90", "p90", 8),
+    ("Max", "max", 8),
+]
+
+_ROLLUP_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        name       TEXT PRIMARY KEY,
+        watermark  INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_components (
+        session_ref     INTEGER NOT NULL,
+        component_type  TEXT NOT NULL,
+        component_name  TEXT NOT NULL,
+        activations     INTEGER NOT NULL,
+        PRIMARY KEY (session_ref, component_type, component_name)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_summary (
+        session_ref  INTEGER PRIMARY KEY,
+        activations  INTEGER NOT NULL,
+        components   INTEGER NOT NULL,
+        first_at     TEXT NOT NULL,
+        last_at      TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS co_usage (
+        a_type    TEXT NOT NULL,
+        a_name    TEXT NOT NULL,
+        b_type    TEXT NOT NULL,
+        b_name    TEXT NOT NULL,
+        sessions  INTEGER NOT NULL,
+        PRIMARY KEY (a_type, a_name, b_type, b_name)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_co_usage_sessions ON co_usage (sessions DESC)",
+)
+
+
+def ensure_rollup_schema(conn: sqlite3.Connection):
+    ensure_schema(conn)
+    for ddl in _ROLLUP_DDL:
+        conn.execute(ddl)
+
+
+def _fold(conn: sqlite3.Connection, low: int, high: int):
+    """Fold activations with ``low < id <= high`` into the rollup tables."""
+    conn.execute("DROP TABLE IF EXISTS temp.rollup_batch")
+    conn.execute("DROP TABLE IF EXISTS temp.rollup_fresh")
+    conn.execute(
+        """
+        CREATE TEMP TABLE rollup_batch AS
+        SELECT session_ref, component_type, component_name,
+               COUNT(*) AS n, MIN(invoked_at) AS first_at, MAX(invoked_at) AS last_at
+        FROM activations
+        WHERE id > ? AND id <= ? AND session_ref IS NOT NULL
+        GROUP BY session_ref, component_type, component_name
+        """,
+        [low, high],
+    )
+    # Components seen in a session for the first time
+    conn.execute(
+        """
+        CREATE TEMP TABLE rollup_fresh AS
+        SELECT b.session_ref, b.component_type, b.component_name
+        FROM rollup_batch b
+        WHERE NOT EXISTS (
+            SELECT 1 FROM session_components sc
+            WHERE sc.session_ref = b.session_ref
+              AND sc.component_type = b.component_type
+              AND sc.component_name = b.component_name
+        )
+        """
+    )
+    conn.execute("CREATE INDEX temp.idx_rollup_fresh ON rollup_fresh (session_ref)")
+    conn.execute(
+        """
+        INSERT INTO co_usage (a_type, a_name, b_type, b_name, sessions)
+        SELECT t1, n1, t2, n2, COUNT(*)
+        FROM (
+            SELECT f.component_type AS t1, f.component_name AS n1,
+                   o.component_type AS t2, o.component_name AS n2
+            FROM rollup_fresh f JOIN session_components o USING (session_ref)
+            UNION ALL
+            SELECT o.component_type, o.component_name, f.component_type, f.component_name
+            FROM rollup_fresh f JOIN session_components o USING (session_ref)
+            UNION ALL
+            SELECT f.component_type, f.component_name, g.component_type, g.component_name
+            FROM rollup_fresh f JOIN rollup_fresh g USING (session_ref)
+        )
+        WHERE (t1, n1) < (t2, n2)
+        GROUP BY t1, n1, t2, n2
+        ON CONFLICT (a_type, a_name, b_type, b_name)
+        DO UPDATE SET sessions = sessions + excluded.sessions
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO session_summary (session_ref, activations, components, first_at, last_at)
+        SELECT b.session_ref, SUM(b.n),
+               (SELECT COUNT(*) FROM rollup_fresh f WHERE f.session_ref = b.session_ref),
+               MIN(b.first_at), MAX(b.last_at)
+        FROM rollup_batch b
+        WHERE true
+        GROUP BY b.session_ref
+        ON CONFLICT (session_ref) DO UPDATE SET
+            activations = activations + excluded.activations,
+            components  = components + excluded.components,
+            first_at    = MIN(first_at, excluded.first_at),
+            last_at     = MAX(last_at, excluded.last_at)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO session_components (session_ref, component_type, component_name, activations)
+        SELECT session_ref, component_type, component_name, n FROM rollup_batch WHERE true
+        ON CONFLICT (session_ref, component_type, component_name)
+        DO UPDATE SET activations = activations + excluded.activations
+        """
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO rollup_state (name, watermark) VALUES ('sessions', ?)",
+        [high],
+    )
+    conn.execute("DROP TABLE temp.rollup_batch")
+    conn.execute("DROP TABLE temp.rollup_fresh")
+
+
+def refresh(conn: sqlite3.Connection, chunk: int = ROLLUP_CHUNK) -> int:
+    """Fold new activations into the rollups; returns how many ids were read.
+
+    Each chunk commits on its own, so an interrupted refresh resumes from
+    the last committed watermark.
+    """
+    ensure_rollup_schema(conn)
+    row = conn.execute("SELECT watermark FROM rollup_state WHERE name = 'sessions'").fetchone()
+    watermark = row[0] if row else 0
+    high = conn.execute("SELECT COALESCE(MAX(id), 0) FROM activations").fetchone()[0]
+    start = watermark
+    while watermark < high:
+        upper = min(watermark + chunk, high)
+        with conn:
+            _fold(conn, watermark, upper)
+        watermark = upper
+    return high - start if high > start else 0
+
+
+def top_pairs(conn: sqlite3.Connection, limit: int = 10,
+              components: list[tuple[str, str]] | None = None) -> list[dict]:
+    """Most co-used component pairs, by number of shared sessions.
+
+    ``components`` (``(name, type)`` pairs, as from ``select_catalog``)
+    keeps only pairs with at least one side in the list.
+    """
+    total = conn.execute("SELECT COUNT(*) FROM session_summary").fetchone()[0]
+    sql = "SELECT a_name, a_type, b_name, b_type, sessions FROM co_usage"
+    params: list = []
+    if components is not None:
+        sql = (
+            "WITH sel (t, n) AS ("
+            " SELECT json_extract(value, '$[1]'), json_extract(value, '$[0]') FROM json_each(?)) "
+            + sql
+            + " WHERE (a_type, a_name) IN (SELECT t, n FROM sel)"
+            "    OR (b_type, b_name) IN (SELECT t, n FROM sel)"
+        )
+        params.append(json.dumps(components))
+    sql += " ORDER BY sessions DESC, a_name, b_name LIMIT ?"
+    params.append(limit)
+    return [
+        {
+            "a_name": a_name, "a_type": a_type, "b_name": b_name, "b_type": b_type,
+            "sessions": sessions,
+            "pct_sessions": 100.0 * sessions / total if total else 0.0,
+        }
+        for a_name, a_type, b_name, b_type, sessions in conn.execute(sql, params)
+    ]
+
+
+def session_distribution(conn: sqlite3.Connection) -> list[dict]:
+    """Distribution rows: activations, distinct components, and minutes per session."""
+    rows = conn.execute(
+        """
+        SELECT activations, components,
+               (julianday(last_at) - julianday(first_at)) * 1440.0
+        FROM session_summary
+        """
+    ).fetchall()
+    if not rows:
+        return []
+    out = []
+    for i, metric in enumerate(("activations", "components", "duration (min)")):
+        vals = sorted(row[i] or 0 for row in rows)
+        out.append({
+            "metric": metric,
+            "sessions": len(vals),
+            "mean": sum(vals) / len(vals),
+            "p50": percentile(vals, 50),
+            "p90": percentile(vals, 90),
+            "max": vals[-1],
+        })
+    return out
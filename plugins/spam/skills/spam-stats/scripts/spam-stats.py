@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # created: 2026-01-31
-# updated: 2026-01-31
+# updated: 2026-10-19
 # created_by:
 #   agent: Claude Code 2.1.27
 #   model: claude-opus-4-5-20251101
@@ -10,22 +10,61 @@
 # ///
 """
 Stats engine for SPAM.
-Queries activation data via DuckDB's SQLite scanner.
+Queries activation data via DuckDB's SQLite scanner (filtered reports via
+stdlib sqlite3, which can use the event store's indexes).
 Renders temporal analytics (daily, weekly, monthly, yearly, all-time).
+Filter flags (--component, --source, --type, --method, --since, --until,
+--top) map directly onto stats_query, which pushes them down into SQL.
+
+The table report also shows per-session distributions and the most
+co-used component pairs, read from rollups that reconcile.py and spam.py
+keep up to date incrementally (session_rollups).
+
+Output is a box table by default; ``--format json|jsonl|csv|arrow`` streams
+rows straight from the DuckDB cursor for dashboards and downstream tools.
 """
 from __future__ import annotations
 
+import argparse
 import json
 import sqlite3
 import sys
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
+from stats_query import (
+    BATCH_SIZE,
+    COMPONENT_TYPES,
+    DETECTION_METHODS,
+    STATS_COLUMNS,
+    execute_stats_query,
+    iter_stats_query,
+    parse_time,
+    run_stats_query,
+    select_catalog,
+    uses_sqlite,
+)
+from stats_watch import clear_screen, watch
+from hook_overhead import OVERHEAD_COLS, iter_samples, summarize
+from session_rollups import (
+    PAIR_COLS,
+    SESSION_COLS,
+    session_distribution,
+    top_pairs,
+)
+from row_output import require_pyarrow, write_rows
+from spam_trace import span, traced
+
 DATA_DIR = Path.home() / ".claude" / "spam"
 DB_PATH = DATA_DIR / "activations.sqlite"
 CATALOG_PATH = DATA_DIR / "catalog.json"
+METRICS_SPOOLS = [DATA_DIR / "hook_metrics.jsonl.1", DATA_DIR / "hook_metrics.jsonl"]
 
+FORMATS = ("table", "json", "jsonl", "csv", "arrow")
 
+
+@traced()
 def load_catalog() -> dict:
     """Load catalog.json; return empty if missing."""
     if not CATALOG_PATH.exists():
@@ -36,12 +75,15 @@ def load_catalog() -> dict:
         return {"skills": [], "commands": []}
 
 
-def get_db_stats() -> dict | None:
+@traced()
+def get_db_stats(conn: sqlite3.Connection | None = None) -> dict | None:
     """Query activation database for metadata and counts."""
     if not DB_PATH.exists():
         return None
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        own = conn is None
+        if own:
+            conn = sqlite3.connect(str(DB_PATH))
         row = conn.execute(
             """
             SELECT
@@ -51,7 +93,8 @@ def get_db_stats() -> dict | None:
             FROM activations
             """
         ).fetchone()
-        conn.close()
+        if own:
+            conn.close()
         if row:
             return {
                 "total_events": row[0],
@@ -63,13 +106,13 @@ def get_db_stats() -> dict | None:
     return None
 
 
-def format_stats_table(data: list[dict]) -> str:
+def format_stats_table(data: list[dict], cols: list | None = None) -> str:
     """Format activation stats into an aligned ASCII table."""
     if not data:
         return "(no data)"
 
     # Column definitions
-    cols = [
+    cols = cols or [
         ("Component", "name", 25),
         ("Type", "type", 10),
         ("Today", "today", 8),
@@ -92,7 +135,9 @@ def format_stats_table(data: list[dict]) -> str:
         cells = []
         for col_name, key, width in cols:
             val = row.get(key, "")
-            if isinstance(val, int):
+            if isinstance(val, float):
+                cells.append(f"{val:>{width}.1f}")
+            elif isinstance(val, int):
                 cells.append(f"{val:>{width}}")
             else:
                 cells.append(f"{str(val):<{width}}")
@@ -103,92 +148,62 @@ def format_stats_table(data: list[dict]) -> str:
     return "\n".join(lines)
 
 
-def run_stats_query(db_path: str, catalog: dict) -> list[dict]:
-    """
-    Execute DuckDB query against SQLite database.
-    Returns list of dicts with activation counts per time horizon.
-    """
-    try:
-        import duckdb
-    except ImportError:
-        print(
-            "Error: duckdb not installed.\n"
-            "Run with: uv run --script <this-script>\n"
-            "Or install manually: pip install duckdb\n"
-        )
-        sys.exit(1)
-
-    conn = duckdb.connect()
-    conn.execute("INSTALL sqlite; LOAD sqlite;")
-    conn.execute(f"ATTACH '{db_path}' AS spam (TYPE sqlite, READ_ONLY)")
-
-    # Build catalog CTE values dynamically
-    catalog_items = []
-    for skill in catalog.get("skills", []):
-        catalog_items.append((skill["name"], "skill"))
-    for cmd in catalog.get("commands", []):
-        catalog_items.append((cmd["name"], "command"))
+def write_stats_arrow(db_path: str | None, catalog: dict, out=None, **filters) -> int:
+    """Stream the stats result as an Arrow IPC stream, batch by batch.
 
-    # Deduplicate and sort
-    catalog_items = sorted(set(catalog_items))
-
-    if not catalog_items:
-        return []
-
-    # Build VALUES clause
-    values_list = ", ".join(
-        f"('{name}', '{ctype}')" for name, ctype in catalog_items
-    )
-
-    query = f"""
-    WITH catalog AS (
-        VALUES {values_list}
-        AS t(component_name, component_type)
-    )
-    SELECT
-        c.component_name AS name,
-        c.component_type AS type,
-        COUNT(i.id) FILTER (WHERE DATE(i.invoked_at) = CURRENT_DATE)
-            AS today,
-        COUNT(i.id) FILTER (WHERE i.invoked_at >= CURRENT_DATE - INTERVAL '7 days')
-            AS weekly,
-        COUNT(i.id) FILTER (WHERE i.invoked_at >= CURRENT_DATE - INTERVAL '30 days')
-            AS monthly,
-        COUNT(i.id) FILTER (WHERE i.invoked_at >= CURRENT_DATE - INTERVAL '365 days')
-            AS yearly,
-        COUNT(i.id) AS all_time
-    FROM catalog c
-    LEFT JOIN spam.activations i
-        ON c.component_name = i.component_name
-        AND c.component_type = i.component_type
-    GROUP BY c.component_name, c.component_type
-    ORDER BY all_time DESC, name ASC
+    Unfiltered, record batches come straight from DuckDB's Arrow export —
+    no per-row Python objects are built. Filtered results (already small,
+    from sqlite3) are batched from their rows.
     """
-
-    result = conn.execute(query).fetchall()
-    conn.close()
-
-    # Convert to list of dicts
-    return [
-        {
-            "name": row[0],
-            "type": row[1],
-            "today": row[2],
-            "weekly": row[3],
-            "monthly": row[4],
-            "yearly": row[5],
-            "all_time": row[6],
-        }
-        for row in result
-    ]
+    pa = require_pyarrow()
+    sink = out or sys.stdout.buffer
+    schema = pa.schema(
+        [("name", pa.string()), ("type", pa.string())]
+        + [(col, pa.int64()) for col in STATS_COLUMNS[2:]]
+    )
+    if db_path and uses_sqlite(filters):
+        count = 0
+        rows = iter_stats_query(db_path, catalog, **filters)
+        with pa.ipc.new_stream(sink, schema) as writer:
+            while True:
+                batch = list(islice(rows, BATCH_SIZE))
+                if not batch:
+                    break
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+        return count
+
+    conn = execute_stats_query(db_path, catalog, **filters) if db_path else None
+    if conn is None:
+        with pa.ipc.new_stream(sink, schema):
+            pass
+        return 0
+
+    count = 0
+    try:
+        # duckdb>=1.4 renamed fetch_record_batch() to to_arrow_reader()
+        if hasattr(conn, "to_arrow_reader"):
+            reader = conn.to_arrow_reader(BATCH_SIZE)
+        else:
+            reader = conn.fetch_record_batch(BATCH_SIZE)
+        with pa.ipc.new_stream(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                count += batch.num_rows
+    finally:
+        conn.close()
+    return count
 
 
-def get_detection_method_counts() -> dict:
+@traced()
+def get_detection_method_counts(conn: sqlite3.Connection | None = None) -> dict:
     """Count activations by detection method."""
     if not DB_PATH.exists():
         return {}
     try:
-        conn = sqlite3.connect(str(DB_PATH))
+        own = conn is None
+        if own:
+            conn = sqlite3.connect(str(DB_PATH))
         rows = conn.execute(
             """
             SELECT detection_method, COUNT(*) as count
@@ -197,15 +212,124 @@ def get_detection_method_counts() -> dict:
             ORDER BY count DESC
             """
         ).fetchall()
-        conn.close()
+        if own:
+            conn.close()
         return {method: count for method, count in rows}
     except Exception:
         return {}
 
 
-def main():
-    catalog = load_catalog()
-    db_stats = get_db_stats()
+@traced()
+def get_session_rollups(
+    conn: sqlite3.Connection | None = None,
+    pairs: int = 10,
+    components: list[tuple[str, str]] | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """Return (top pairs, distribution) from the materialized session rollups.
+
+    Read-only: reconcile.py and spam.py refresh the rollups. Before their
+    first refresh (no rollup tables yet) both lists are empty.
+    """
+    if not DB_PATH.exists():
+        return [], []
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, timeout=1.0)
+    try:
+        return (
+            top_pairs(conn, pairs, components) if pairs else [],
+            session_distribution(conn),
+        )
+    except sqlite3.OperationalError:
+        return [], []
+    finally:
+        if own:
+            conn.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SPAM activation analytics")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="table",
+        help="Output format (default: table). Non-table formats emit rows only.",
+    )
+    parser.add_argument("--component", metavar="GLOB",
+                        help="Only components whose name matches GLOB (e.g. 'spam-*')")
+    parser.add_argument("--source",
+                        help="Only components from this catalog source (e.g. plugin:spam)")
+    parser.add_argument("--type", dest="component_type", choices=COMPONENT_TYPES,
+                        help="Only skills or only commands")
+    parser.add_argument("--method", dest="detection_method", choices=DETECTION_METHODS,
+                        help="Only count activations with this detection method")
+    parser.add_argument("--since", type=parse_time, metavar="TIME",
+                        help="Only count activations at/after TIME (ISO date/datetime or 30m/24h/7d/2w)")
+    parser.add_argument("--until", type=parse_time, metavar="TIME",
+                        help="Only count activations before TIME (same forms as --since)")
+    parser.add_argument("--top", type=int, metavar="N",
+                        help="Only the N most-activated components")
+    parser.add_argument("--pairs", type=int, default=10, metavar="N",
+                        help="Top co-used component pairs to show (default: 10; 0 hides)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and redraw as new activations arrive")
+    parser.add_argument("--interval", type=float, default=2.0, metavar="SECONDS",
+                        help="Redraw interval for --watch (default: 2)")
+    args = parser.parse_args(argv)
+    if args.watch and args.format != "table":
+        parser.error("--watch only supports --format table")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
+    if args.pairs < 0:
+        parser.error("--pairs must be 0 or more")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    return args
+
+
+def query_filters(args: argparse.Namespace) -> dict:
+    """Map parsed CLI flags onto stats_query filter keywords."""
+    keys = ("component", "source", "component_type", "detection_method",
+            "since", "until", "top")
+    return {key: getattr(args, key) for key in keys if getattr(args, key) is not None}
+
+
+def watch_report(catalog: dict, filters: dict, interval: float):
+    """Live-updating table, fed incrementally from the id cursor."""
+    def render(rows: list[dict], new_events: int, cursor: int):
+        clear_screen()
+        print("SPAM — Skill & Plugin Activations Monitor (watch)")
+        print("=" * 40)
+        print()
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        print(f"{now} UTC — cursor id {cursor}, +{new_events} new "
+              f"(every {interval:g}s, Ctrl-C to stop)")
+        if filters:
+            print("Filters: " + ", ".join(f"{k}={v}" for k, v in filters.items()))
+        print()
+        print(format_stats_table(rows))
+        sys.stdout.flush()
+
+    watch(str(DB_PATH), catalog, render, interval=interval, **filters)
+
+
+def main(argv=None, catalog: dict | None = None, conn: sqlite3.Connection | None = None):
+    """Render the report. ``catalog``/``conn`` let an in-process caller
+    (the spam.py pipeline) share what it already loaded."""
+    args = parse_args(argv)
+    filters = query_filters(args)
+    if catalog is None:
+        catalog = load_catalog()
+    db_stats = get_db_stats(conn)
+
+    if args.format == "arrow":
+        write_stats_arrow(str(DB_PATH) if db_stats else None, catalog, **filters)
+        return
+    if args.format != "table":
+        rows = iter_stats_query(str(DB_PATH), catalog, **filters) if db_stats else iter(())
+        with span("write_rows", format=args.format):
+            write_rows(rows, args.format, STATS_COLUMNS)
+        return
 
     if db_stats is None:
         print("SPAM — Skill & Plugin Activations Monitor")
@@ -220,9 +344,14 @@ def main():
         print()
         return
 
+    if args.watch:
+        watch_report(catalog, filters, args.interval)
+        return
+
     # Query stats
-    stats = run_stats_query(str(DB_PATH), catalog)
-    detection_counts = get_detection_method_counts()
+    with span("run_stats_query"):
+        stats = run_stats_query(str(DB_PATH), catalog, **filters)
+    detection_counts = get_detection_method_counts(conn)
 
     # Render report
     print("SPAM — Skill & Plugin Activations Monitor")
@@ -232,13 +361,16 @@ def main():
     skill_count = len(catalog.get("skills", []))
     cmd_count = len(catalog.get("commands", []))
     print(f"Catalog: {skill_count} skills, {cmd_count} commands")
+    if filters:
+        print("Filters: " + ", ".join(f"{k}={v}" for k, v in filters.items()))
     print(f"Database: {DB_PATH} ({db_stats['total_events']} events)")
     if db_stats.get("latest"):
         print(f"Latest activation: {db_stats['latest']}")
     print()
 
     # Stats table
-    print(format_stats_table(stats))
+    with span("render_table", rows=len(stats)):
+        print(format_stats_table(stats))
     print()
 
     # Detection method summary
@@ -252,6 +384,32 @@ def main():
         print(f"Detection methods: {methods}")
     print()
 
+    # Session analytics, from the incrementally maintained rollups
+    selected = None
+    if args.component or args.source or args.component_type:
+        selected = select_catalog(catalog, args.component, args.source, args.component_type)
+    pairs, per_session = get_session_rollups(conn, args.pairs, selected)
+    if per_session:
+        print("Sessions (all time; activations with a recorded session):")
+        print(format_stats_table(per_session, SESSION_COLS))
+        print()
+    if pairs:
+        print("Top co-used pairs (sessions using both):")
+        print(format_stats_table(pairs, PAIR_COLS))
+        print()
+
+    # Hook self-overhead, from track.py's metrics spool
+    with span("hook_overhead"):
+        overhead = summarize(iter_samples(METRICS_SPOOLS))
+    if overhead:
+        print("Hook overhead (ms per hook call, sampled; clock 'process' includes "
+              "interpreter startup, 'in-script' does not):")
+        print(format_stats_table(overhead, OVERHEAD_COLS))
+        errors = sum(row["errors"] for row in overhead)
+        if errors:
+            print(f"Swallowed exceptions: {errors}")
+        print()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["duckdb>=1.0"]
+# ///
+"""
+In-process SPAM pipeline: catalog → reconcile → rollups → stats.
+Runs catalog-builder, reconcile, and spam-stats in one interpreter, sharing
+the loaded catalog and one SQLite connection. Each stage is skipped when its
+input fingerprint matches the previous run:
+
+    catalog    plugin manifest + stat signature of every scan tree
+               (rebuilt anyway if catalog.index.json is missing or stale)
+    reconcile  transcript size/mtime/inode vs. reconcile_checkpoints
+    rollups    id watermark in rollup_state (folds only new activations)
+    stats      catalog fingerprint + DB watermark (MAX(id)) + UTC report date
+               + hook metrics spool + resolved report arguments
+               (table format only; row formats and --watch stream through)
+
+Unrecognized arguments are passed to spam-stats.py (--format, filters, ...).
+Stage status goes to stderr; the report goes to stdout.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import sqlite3
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import catalog_index
+import reconcile
+import session_rollups
+from spam_trace import span
+from stats_query import report_date
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path.home() / ".claude" / "spam"
+STATE_PATH = DATA_DIR / "pipeline-state.json"
+
+
+def load_script(filename: str):
+    """Import a hyphen-named sibling script as a module."""
+    name = filename[:-3].replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_state() -> dict:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state: dict):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, STATE_PATH)
+
+
+def db_watermark(conn) -> int:
+    if conn is None:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM activations").fetchone()[0]
+
+
+def files_signature(paths: list[Path]) -> list:
+    sig = []
+    for path in paths:
+        try:
+            st = path.stat()
+            sig.append([str(path), st.st_mtime_ns, st.st_size])
+        except OSError:
+            sig.append([str(path), None, None])
+    return sig
+
+
+def log(message: str):
+    print(f"spam: {message}", file=sys.stderr)
+
+
+def run_catalog(builder, stats, state: dict, force: bool) -> dict:
+    fingerprint = builder.catalog_fingerprint()
+    state["catalog_fingerprint"] = fingerprint
+    # A missing or stale index (catalog.json edited or index deleted) forces
+    # a rebuild even when the scan trees are unchanged
+    if (not force and fingerprint == state.get("catalog_built")
+            and builder.CATALOG_PATH.exists()
+            and catalog_index.load_index(builder.INDEX_PATH, builder.CATALOG_PATH) is not None):
+        log("catalog unchanged — skipped")
+        return stats.load_catalog()
+    catalog = builder.build_catalog()
+    builder.write_catalog(catalog)
+    state["catalog_built"] = fingerprint
+    log(f"catalog rebuilt — {len(catalog['skills'])} skills, {len(catalog['commands'])} commands")
+    return catalog
+
+
+def run_reconcile(conn, force: bool):
+    transcript_dir = reconcile.TRANSCRIPT_DIR
+    if conn is None or not transcript_dir.is_dir():
+        log("reconcile: no database or transcript dir — skipped")
+        return
+    with span("pending_check"):
+        checkpoints = reconcile.load_checkpoints(conn)
+        pending = reconcile.pending_transcripts(
+            reconcile.list_transcripts(transcript_dir), checkpoints
+        )
+    if not pending and not force:
+        log("reconcile: transcripts unchanged — skipped")
+        return
+    found, inserted = reconcile.reconcile(conn, transcript_dir)
+    log(f"reconcile: {len(pending)} changed transcripts, {found} events, {inserted} backfilled")
+
+
+def run_rollups(conn):
+    """Fold activations past the rollup watermark (hook writes included)."""
+    if conn is None:
+        return
+    try:
+        folded = session_rollups.refresh(conn)
+    except sqlite3.OperationalError:
+        log("rollups: database busy — last materialized rollups reported")
+        return
+    if folded:
+        log(f"rollups: {folded} activations folded")
+
+
+def run_stats(stats, catalog: dict, conn, state: dict, stats_argv: list, force: bool):
+    args = stats.parse_args(stats_argv)
+    if args.watch or args.format != "table":
+        # Live or streamed row output — written straight through, not cached
+        stats.main(stats_argv, catalog=catalog, conn=conn)
+        return
+
+    # Resolved arguments, so relative --since/--until windows are keyed
+    # by the absolute time they stand for now, not by "24h"
+    key = hashlib.sha1(json.dumps([
+        state.get("catalog_fingerprint"),
+        db_watermark(conn),
+        report_date().isoformat(),
+        files_signature(stats.METRICS_SPOOLS),
+        sorted(vars(args).items()),
+    ]).encode()).hexdigest()
+    cached = state.get("stats", {})
+    if not force and cached.get("key") == key:
+        log("stats inputs unchanged — cached report")
+        sys.stdout.write(cached.get("output", ""))
+        return
+
+    buf = io.StringIO()
+    try:
+        with redirect_stdout(buf):
+            stats.main(stats_argv, catalog=catalog, conn=conn)
+    finally:
+        # Written even if the report exits early (e.g. duckdb missing);
+        # only a completed report is cached
+        sys.stdout.write(buf.getvalue())
+    state["stats"] = {"key": key, "output": buf.getvalue()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the SPAM catalog → reconcile → rollups → stats pipeline in one process",
+    )
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore fingerprints and run every stage")
+    args, stats_argv = parser.parse_known_args(argv)
+
+    builder = load_script("catalog-builder.py")
+    stats = load_script("spam-stats.py")
+    state = load_state()
+
+    with span("stage:catalog"):
+        catalog = run_catalog(builder, stats, state, args.force)
+
+    conn = reconcile.connect() if reconcile.DB_PATH.exists() else None
+    try:
+        with span("stage:reconcile"):
+            run_reconcile(conn, args.force)
+        with span("stage:rollups"):
+            run_rollups(conn)
+        with span("stage:stats"):
+            run_stats(stats, catalog, conn, state, stats_argv, args.force)
+    finally:
+        if conn is not None:
+            conn.close()
+        save_state(state)
+
+
+if __name__ == "__main__":
+    main()
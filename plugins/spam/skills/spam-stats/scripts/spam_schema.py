@@ -0,0 +1,109 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Event store schema for SPAM — the one definition of activations.sqlite.
+Used by track.py (loaded by path from the hooks dir), reconcile.py,
+session_rollups.py, and the benchmark's synthetic data generator.
+
+The schema is versioned with ``PRAGMA user_version``:
+
+    1  activations + time/component indexes
+    2  session_ref/cwd_ref on activations; sessions/cwds dictionaries
+
+Session id, transcript path and cwd strings are dictionary-encoded: each
+lives once in ``sessions``/``cwds`` and activations store integer refs.
+Stdlib only — this runs on the hook hot path.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+SCHEMA_VERSION = 2
+
+ACTIVATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS activations (
+        id                INTEGER PRIMARY KEY AUTOINCREMENT,
+        component_name    TEXT NOT NULL,
+        component_type    TEXT NOT NULL
+                          CHECK (component_type IN ('skill', 'command')),
+        detection_method  TEXT NOT NULL
+                          CHECK (detection_method IN ('tool_call', 'prompt_match', 'bash_match', 'transcript')),
+        invoked_at        TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+    )
+"""
+DICTIONARY_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id               INTEGER PRIMARY KEY,
+        session_id       TEXT NOT NULL UNIQUE,
+        transcript_path  TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cwds (
+        id    INTEGER PRIMARY KEY,
+        path  TEXT NOT NULL UNIQUE
+    )
+    """,
+)
+REF_COLUMNS = (("session_ref", "sessions"), ("cwd_ref", "cwds"))
+INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_activations_time ON activations (invoked_at)",
+    "CREATE INDEX IF NOT EXISTS idx_activations_component"
+    " ON activations (component_name, component_type)",
+    "CREATE INDEX IF NOT EXISTS idx_activations_session ON activations (session_ref)",
+)
+
+
+def create_indexes(conn: sqlite3.Connection):
+    for ddl in INDEX_DDL:
+        conn.execute(ddl)
+
+
+def ensure_schema(conn: sqlite3.Connection, indexes: bool = True):
+    """Create or migrate the event store to SCHEMA_VERSION.
+
+    Cheap when current (one PRAGMA read). Otherwise runs under an immediate
+    write lock and re-checks the version, so parallel hooks don't race the
+    ALTERs. ``indexes=False`` leaves indexes to a later ``create_indexes``
+    (bulk loads).
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            conn.rollback()
+            return
+        conn.execute(ACTIVATIONS_DDL)
+        for ddl in DICTIONARY_DDL:
+            conn.execute(ddl)
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(activations)")}
+        for col, ref in REF_COLUMNS:
+            if col not in cols:
+                conn.execute(f"ALTER TABLE activations ADD COLUMN {col} INTEGER REFERENCES {ref} (id)")
+        if indexes:
+            create_indexes(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def intern(conn: sqlite3.Connection, table: str, column: str, value: str | None,
+           **extra) -> int | None:
+    """Return the dictionary id for ``value``, inserting it on first sight.
+
+    ``intern(conn, "sessions", "session_id", sid, transcript_path=path)``;
+    ``extra`` columns are only written with the first insert.
+    """
+    if not value:
+        return None
+    cols = [column] + list(extra)
+    conn.execute(
+        f"INSERT OR IGNORE INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+        [value] + list(extra.values()),
+    )
+    return conn.execute(f"SELECT id FROM {table} WHERE {column} = ?", [value]).fetchone()[0]
@@ -0,0 +1,122 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Opt-in tracing for SPAM scripts.
+
+    SPAM_TRACE=1        record timed spans, write a Chrome trace on exit
+    SPAM_TRACE=profile  same, plus a cProfile dump next to the trace
+    SPAM_TRACE_DIR      output directory (default ~/.claude/spam/traces)
+
+Open the ``.trace.json`` in chrome://tracing or https://ui.perfetto.dev;
+read the ``.prof`` with ``python -m pstats`` or snakeviz.
+
+When SPAM_TRACE is unset, ``span()`` returns one shared no-op context
+manager and ``traced()`` returns the function untouched. Stdlib only.
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+MODE = os.environ.get("SPAM_TRACE", "").strip().lower()
+ENABLED = MODE not in ("", "0", "false", "off")
+TRACE_DIR = Path(
+    os.environ.get("SPAM_TRACE_DIR", str(Path.home() / ".claude" / "spam" / "traces"))
+)
+
+_NULL = contextlib.nullcontext()
+_events: list[dict] = []
+_profiler = None
+_script = Path(sys.argv[0]).stem or "python"
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        event = {
+            "name": self.name,
+            "cat": _script,
+            "ph": "X",
+            "ts": round(self.start * 1e6, 3),
+            "dur": round((end - self.start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": 0,
+        }
+        if self.args or exc_type:
+            event["args"] = dict(self.args)
+            if exc_type:
+                event["args"]["error"] = exc_type.__name__
+        _events.append(event)
+        return False
+
+
+def span(name: str, **args):
+    """Time a block: ``with span("backfill", events=n): ...``."""
+    if not ENABLED:
+        return _NULL
+    return _Span(name, {k: str(v) for k, v in args.items()})
+
+
+def traced(name: str | None = None):
+    """Decorator form of ``span`` — a no-op when tracing is disabled."""
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*a, **kw):
+            with _Span(label, {}):
+                return fn(*a, **kw)
+
+        return inner
+    return wrap
+
+
+def _flush():
+    """Write collected spans (and the profile) once, at interpreter exit."""
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    base = TRACE_DIR / f"{_script}-{stamp}-{os.getpid()}"
+    try:
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        if _profiler is not None:
+            _profiler.disable()
+            _profiler.dump_stats(str(base) + ".prof")
+        trace = {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": os.getpid(),
+                 "args": {"name": _script}},
+            ] + _events,
+            "displayTimeUnit": "ms",
+        }
+        path = Path(str(base) + ".trace.json")
+        path.write_text(json.dumps(trace), encoding="utf-8")
+        print(f"SPAM_TRACE: wrote {path}", file=sys.stderr)
+    except OSError as exc:
+        print(f"SPAM_TRACE: could not write trace: {exc}", file=sys.stderr)
+
+
+if ENABLED:
+    if MODE == "profile":
+        import cProfile
+
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(_flush)
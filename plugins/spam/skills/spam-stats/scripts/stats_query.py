@@ -0,0 +1,376 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Filtered stats queries for SPAM.
+Builds the per-component horizon query with filters pushed down into SQL.
+Catalog-side filters (component glob, source, type) shrink the selected
+catalog before anything is queried.
+
+DuckDB's SQLite scanner pushes down only projected columns and rowid
+ranges, not WHERE predicates, so a filtered DuckDB query would still pull
+all of ``activations`` across. Filtered reports therefore run the ``hits``
+aggregation through stdlib sqlite3, where the event-side predicates
+(component glob, type, detection method, time range) can use the component
+and time indexes, and join the counts to the selected catalog in Python.
+Unfiltered reports, which read every row anyway, go through DuckDB.
+Used by spam-stats.py; importable on its own.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import re
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from spam_trace import span
+
+STATS_COLUMNS = ("name", "type", "today", "weekly", "monthly", "yearly", "all_time")
+COMPONENT_TYPES = ("skill", "command")
+DETECTION_METHODS = ("tool_call", "prompt_match", "bash_match", "transcript")
+BATCH_SIZE = 1024
+HORIZON_DAYS = (7, 30, 365)
+HORIZON_COUNTS = """
+            COUNT(*) FILTER (WHERE invoked_at >= ? AND invoked_at < ?) AS today,
+            COUNT(*) FILTER (WHERE invoked_at >= ?) AS weekly,
+            COUNT(*) FILTER (WHERE invoked_at >= ?) AS monthly,
+            COUNT(*) FILTER (WHERE invoked_at >= ?) AS yearly,
+            COUNT(*) AS all_time"""
+
+# Filters that narrow the activations scan; any of them selects the sqlite3 path
+PUSHDOWN_FILTERS = ("component", "source", "component_type", "detection_method", "since", "until")
+
+_RELATIVE_TIME = re.compile(r"^(\d+)([mhdw])$")
+_RELATIVE_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def require_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        print(
+            "Error: duckdb not installed.\n"
+            "Run with: uv run --script <this-script>\n"
+            "Or install manually: pip install duckdb\n",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return duckdb
+
+
+def parse_time(value: str) -> str:
+    """Normalize a time bound to the ``invoked_at`` text format (UTC).
+
+    Accepts ISO 8601 dates/datetimes or a relative offset from now such as
+    ``30m``, ``24h``, ``7d``, ``2w``. Raises ``ValueError`` otherwise.
+    """
+    value = value.strip()
+    match = _RELATIVE_TIME.match(value)
+    if match:
+        amount, unit = match.groups()
+        ts = datetime.now(timezone.utc) - timedelta(**{_RELATIVE_UNITS[unit]: int(amount)})
+    else:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc)
+    return ts.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def report_date() -> date:
+    """The day the horizons are anchored to: today in UTC, like ``invoked_at``."""
+    return datetime.now(timezone.utc).date()
+
+
+def horizon_bounds(today: date | None = None) -> list[str]:
+    """``invoked_at``-comparable cutoffs for the horizon columns.
+
+    ``[today, tomorrow, weekly, monthly, yearly]`` as ISO dates, bound in
+    the order ``HORIZON_COUNTS`` uses them. ``invoked_at`` is TEXT (DuckDB's
+    SQLite scanner reads it as VARCHAR), so horizons compare strings, like
+    ``--since``/``--until`` and the watch mode's day buckets.
+    """
+    today = today or report_date()
+    return [
+        today.isoformat(),
+        (today + timedelta(days=1)).isoformat(),
+    ] + [(today - timedelta(days=n)).isoformat() for n in HORIZON_DAYS]
+
+
+def select_catalog(
+    catalog: dict,
+    component: str | None = None,
+    source: str | None = None,
+    component_type: str | None = None,
+) -> list[tuple[str, str]]:
+    """Return sorted, deduplicated ``(name, type)`` pairs passing the filters."""
+    selected: set = set()
+    for ctype, key in (("skill", "skills"), ("command", "commands")):
+        if component_type and component_type != ctype:
+            continue
+        for item in catalog.get(key, []):
+            if source and item.get("source") != source:
+                continue
+            if component and not fnmatch.fnmatchcase(item["name"], component):
+                continue
+            selected.add((item["name"], ctype))
+    return sorted(selected)
+
+
+def event_predicates(
+    component: str | None = None,
+    component_type: str | None = None,
+    detection_method: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> tuple[list[str], list]:
+    """Return WHERE clauses and parameters for the activations-side filters.
+
+    The SQL is valid for both DuckDB and SQLite (``GLOB``, ``?`` params).
+    """
+    where: list[str] = []
+    params: list = []
+    if component:
+        where.append("component_name GLOB ?")
+        params.append(component)
+    if component_type:
+        where.append("component_type = ?")
+        params.append(component_type)
+    if detection_method:
+        where.append("detection_method = ?")
+        params.append(detection_method)
+    if since:
+        where.append("invoked_at >= ?")
+        params.append(since)
+    if until:
+        where.append("invoked_at < ?")
+        params.append(until)
+    return where, params
+
+
+def build_stats_query(
+    catalog: dict,
+    component: str | None = None,
+    source: str | None = None,
+    component_type: str | None = None,
+    detection_method: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    top: int | None = None,
+    today: date | None = None,
+) -> tuple[str, list] | None:
+    """Build the stats SQL and its parameters, or None if nothing matches.
+
+    ``since``/``until`` are already-normalized ``invoked_at`` strings
+    (see ``parse_time``); ``until`` is exclusive. Horizons count back from
+    ``today`` (default ``report_date()``); the cutoffs are bound as ISO
+    strings (``horizon_bounds``) rather than derived from DuckDB's
+    session-local CURRENT_DATE.
+    """
+    items = select_catalog(catalog, component, source, component_type)
+    if not items:
+        return None
+
+    params: list = [
+        [name for name, _ in items],
+        [ctype for _, ctype in items],
+        *horizon_bounds(today),
+    ]
+
+    where, event_params = event_predicates(
+        component=component,
+        component_type=component_type,
+        detection_method=detection_method,
+        since=since,
+        until=until,
+    )
+    if source:
+        # source lives only in the catalog: semi-join on the filtered names
+        where.append("component_name IN (SELECT component_name FROM catalog)")
+    params.extend(event_params)
+    where_sql = ("WHERE " + "\n          AND ".join(where)) if where else ""
+
+    limit_sql = ""
+    if top:
+        limit_sql = "LIMIT ?"
+        params.append(int(top))
+
+    query = f"""
+    WITH catalog AS (
+        SELECT
+            unnest(?::VARCHAR[]) AS component_name,
+            unnest(?::VARCHAR[]) AS component_type
+    ),
+    hits AS (
+        SELECT
+            component_name,
+            component_type,{HORIZON_COUNTS}
+        FROM spam.activations
+        {where_sql}
+        GROUP BY component_name, component_type
+    )
+    SELECT
+        c.component_name AS name,
+        c.component_type AS type,
+        COALESCE(h.today, 0) AS today,
+        COALESCE(h.weekly, 0) AS weekly,
+        COALESCE(h.monthly, 0) AS monthly,
+        COALESCE(h.yearly, 0) AS yearly,
+        COALESCE(h.all_time, 0) AS all_time
+    FROM catalog c
+    LEFT JOIN hits h
+        ON c.component_name = h.component_name
+        AND c.component_type = h.component_type
+    ORDER BY all_time DESC, name ASC
+    {limit_sql}
+    """
+    return query, params
+
+
+def uses_sqlite(filters: dict) -> bool:
+    """True when ``filters`` narrow the scan, so sqlite3 answers the query."""
+    return any(filters.get(key) for key in PUSHDOWN_FILTERS)
+
+
+def build_hits_query(
+    component: str | None = None,
+    component_type: str | None = None,
+    detection_method: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    names: list[str] | None = None,
+    today: date | None = None,
+) -> tuple[str, list]:
+    """SQLite SQL for the per-component horizon counts of matching events.
+
+    ``names`` restricts the scan to those component names (the ``--source``
+    semi-join, since source lives only in the catalog).
+    """
+    where, event_params = event_predicates(
+        component=component,
+        component_type=component_type,
+        detection_method=detection_method,
+        since=since,
+        until=until,
+    )
+    if names is not None:
+        where.append("component_name IN (SELECT value FROM json_each(?))")
+        event_params.append(json.dumps(names))
+    where_sql = ("WHERE " + "\n      AND ".join(where)) if where else ""
+    # Unary + keeps SQLite from walking idx_activations_component just to get
+    # GROUP BY order, so the WHERE clause picks the index (time range for
+    # --since); the handful of matching groups are sorted in a temp b-tree
+    query = f"""
+    SELECT
+        component_name,
+        component_type,{HORIZON_COUNTS}
+    FROM activations
+    {where_sql}
+    GROUP BY +component_name, +component_type
+    """
+    return query, horizon_bounds(today) + event_params
+
+
+def iter_sqlite_stats(
+    db_path: str,
+    catalog: dict,
+    component: str | None = None,
+    source: str | None = None,
+    component_type: str | None = None,
+    detection_method: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    top: int | None = None,
+    today: date | None = None,
+):
+    """Yield stats rows from a filtered sqlite3 aggregation.
+
+    Same rows and order as the DuckDB query: every selected component,
+    zero-filled, by all-time count then name.
+    """
+    items = select_catalog(catalog, component, source, component_type)
+    if not items:
+        return
+    query, params = build_hits_query(
+        component=component,
+        component_type=component_type,
+        detection_method=detection_method,
+        since=since,
+        until=until,
+        names=sorted({name for name, _ in items}) if source else None,
+        today=today,
+    )
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        with span("stats_query", engine="sqlite", components=len(items)):
+            hits = {(row[0], row[1]): row[2:] for row in conn.execute(query, params)}
+    finally:
+        conn.close()
+    zeros = (0,) * (len(STATS_COLUMNS) - 2)
+    rows = [
+        dict(zip(STATS_COLUMNS, (name, ctype) + tuple(hits.get((name, ctype), zeros))))
+        for name, ctype in items
+    ]
+    rows.sort(key=lambda r: (-r["all_time"], r["name"]))
+    yield from rows[:top] if top else rows
+
+
+def connect(db_path: str):
+    """Open an in-memory DuckDB connection with the SQLite store attached."""
+    duckdb = require_duckdb()
+    with span("duckdb_attach"):
+        conn = duckdb.connect()
+        conn.execute("INSTALL sqlite; LOAD sqlite;")
+        conn.execute(f"ATTACH '{db_path}' AS spam (TYPE sqlite, READ_ONLY)")
+    return conn
+
+
+def execute_stats_query(db_path: str, catalog: dict, **filters):
+    """
+    Execute the stats query against the SQLite database via DuckDB.
+    Returns the DuckDB connection with the result pending (caller fetches
+    and closes), or None when no catalog component matches the filters.
+    """
+    built = build_stats_query(catalog, **filters)
+    if built is None:
+        return None
+    query, params = built
+    conn = connect(db_path)
+    with span("stats_query", engine="duckdb", components=len(params[0])):
+        conn.execute(query, params)
+    return conn
+
+
+def iter_stats_query(db_path: str, catalog: dict, batch_size: int = BATCH_SIZE, **filters):
+    """Yield one dict per component: from sqlite3 when filtered (see
+    ``uses_sqlite``), otherwise fetched from the DuckDB cursor in batches."""
+    if uses_sqlite(filters):
+        yield from iter_sqlite_stats(db_path, catalog, **filters)
+        return
+    yield from iter_duckdb_stats(db_path, catalog, batch_size, **filters)
+
+
+def iter_duckdb_stats(db_path: str, catalog: dict, batch_size: int = BATCH_SIZE, **filters):
+    """Yield one dict per component from DuckDB, whatever the filters."""
+    conn = execute_stats_query(db_path, catalog, **filters)
+    if conn is None:
+        return
+    try:
+        while True:
+            with span("fetch_batch"):
+                batch = conn.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                yield dict(zip(STATS_COLUMNS, row))
+    finally:
+        conn.close()
+
+
+def run_stats_query(db_path: str, catalog: dict, **filters) -> list[dict]:
+    """
+    Execute the stats query against the SQLite database.
+    Returns list of dicts with activation counts per time horizon.
+    """
+    return list(iter_stats_query(db_path, catalog, **filters))
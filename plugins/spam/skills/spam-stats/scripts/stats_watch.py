@@ -0,0 +1,196 @@
+# created: 2026-10-19
+# created_by:
+#   github_username: andrew-tomago
+"""
+Live watch mode for SPAM stats.
+Keeps one read-only SQLite connection open and polls ``activations`` for
+rows past an ``id`` cursor. Counts are held in memory as per-day buckets
+plus running horizon totals (today/weekly/monthly/yearly): each tick adds
+only new events, and buckets are subtracted from the totals only when the
+UTC day rolls over. Days are UTC (``report_date``), the same boundary the
+one-shot query uses. Stdlib only.
+"""
+from __future__ import annotations
+
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+from stats_query import event_predicates, report_date, select_catalog
+
+HORIZON_DAYS = (("weekly", 7), ("monthly", 30), ("yearly", 365))
+
+
+def connect_readonly(db_path: str) -> sqlite3.Connection:
+    """Open the event store read-only; WAL lets it see hook commits live."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=1.0)
+    conn.execute("PRAGMA busy_timeout = 500")
+    return conn
+
+
+def horizon_cutoffs(today: date) -> dict[str, str]:
+    """First day (ISO) counted by each horizon; ``today`` counts that day only."""
+    cutoffs = {"today": today.isoformat()}
+    for label, n in HORIZON_DAYS:
+        cutoffs[label] = (today - timedelta(days=n)).isoformat()
+    return cutoffs
+
+
+class HorizonCounters:
+    """In-memory activation counts per component, bucketed by UTC day,
+    with running totals per horizon."""
+
+    def __init__(self, components: list[tuple[str, str]], today: date):
+        self.components = set(components)
+        self.days: dict[tuple[str, str], dict[str, int]] = {c: {} for c in components}
+        self.all_time: dict[tuple[str, str], int] = {c: 0 for c in components}
+        self.totals: dict[tuple[str, str], dict[str, int]] = {
+            c: {"today": 0, **{label: 0 for label, _ in HORIZON_DAYS}} for c in components
+        }
+        self.today = today
+        self.cutoffs = horizon_cutoffs(today)
+        self.cursor = 0
+        self._rows: list[dict] | None = None
+
+    def add(self, key: tuple[str, str], day: str, count: int) -> bool:
+        """Count events for a component; False if it is not being watched."""
+        if key not in self.components:
+            return False
+        buckets = self.days[key]
+        buckets[day] = buckets.get(day, 0) + count
+        self.all_time[key] += count
+        totals = self.totals[key]
+        if day == self.cutoffs["today"]:
+            totals["today"] += count
+        for label, _ in HORIZON_DAYS:
+            if day >= self.cutoffs[label]:
+                totals[label] += count
+        self._rows = None
+        return True
+
+    def advance(self, today: date):
+        """Move the horizons to ``today`` if the UTC day has rolled over.
+
+        Buckets leaving a horizon are subtracted from its total, and buckets
+        older than every horizon are dropped. A one-day roll costs a few
+        lookups per component; a long gap (or a clock step back) recounts
+        from the buckets still held.
+        """
+        if today == self.today:
+            return
+        gap = (today - self.today).days
+        old, new = self.cutoffs, horizon_cutoffs(today)
+        leaving = None
+        if 0 < gap <= HORIZON_DAYS[0][1]:
+            # Days between each horizon's old and new cutoff
+            leaving = {
+                label: [(date.fromisoformat(old[label]) + timedelta(days=i)).isoformat()
+                        for i in range(gap)]
+                for label, _ in HORIZON_DAYS
+            }
+        for key, buckets in self.days.items():
+            totals = self.totals[key]
+            totals["today"] = buckets.get(new["today"], 0)
+            for label, _ in HORIZON_DAYS:
+                if leaving is None:
+                    totals[label] = sum(n for day, n in buckets.items() if day >= new[label])
+                else:
+                    totals[label] -= sum(buckets.get(day, 0) for day in leaving[label])
+            for day in [d for d in buckets if d < new["yearly"]]:
+                del buckets[day]
+        self.today = today
+        self.cutoffs = new
+        self._rows = None
+
+    def rows(self, top: int | None = None) -> list[dict]:
+        """Render counters in run_stats_query()'s row shape and order.
+
+        Rebuilt only after new events or a day roll; otherwise the last
+        rows are reused.
+        """
+        if self._rows is None:
+            out = [
+                {"name": name, "type": ctype, **self.totals[(name, ctype)],
+                 "all_time": self.all_time[(name, ctype)]}
+                for name, ctype in self.days
+            ]
+            out.sort(key=lambda r: (-r["all_time"], r["name"]))
+            self._rows = out
+        return self._rows[:top] if top else self._rows
+
+
+def poll(conn: sqlite3.Connection, counters: HorizonCounters, **filters) -> int:
+    """Fold activations with ``id`` past the cursor into ``counters``.
+
+    Returns the number of new matching events. The upper bound is read
+    first so the cursor advances even when no new row matches the filters.
+    """
+    high = conn.execute("SELECT MAX(id) FROM activations").fetchone()[0] or 0
+    if high <= counters.cursor:
+        return 0
+
+    where, params = event_predicates(**filters)
+    where = ["id > ?", "id <= ?"] + where
+    rows = conn.execute(
+        f"""
+        SELECT component_name, component_type, substr(invoked_at, 1, 10) AS day,
+               COUNT(*)
+        FROM activations
+        WHERE {" AND ".join(where)}
+        GROUP BY component_name, component_type, day
+        """,
+        [counters.cursor, high] + params,
+    ).fetchall()
+    counters.cursor = high
+
+    new = 0
+    for name, ctype, day, count in rows:
+        if counters.add((name, ctype), day, count):
+            new += count
+    return new
+
+
+def watch(
+    db_path: str,
+    catalog: dict,
+    render,
+    interval: float = 2.0,
+    component: str | None = None,
+    source: str | None = None,
+    component_type: str | None = None,
+    detection_method: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    top: int | None = None,
+):
+    """Poll and redraw until interrupted.
+
+    ``render(rows, new_events, cursor)`` draws one frame; the first poll
+    seeds the counters from full history, every later one reads only new ids.
+    """
+    components = select_catalog(catalog, component, source, component_type)
+    counters = HorizonCounters(components, report_date())
+    filters = {
+        "component": component,
+        "component_type": component_type,
+        "detection_method": detection_method,
+        "since": since,
+        "until": until,
+    }
+    conn = connect_readonly(db_path)
+    try:
+        while True:
+            counters.advance(report_date())
+            new = poll(conn, counters, **filters)
+            render(counters.rows(top), new, counters.cursor)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+def clear_screen():
+    if sys.stdout.isatty():
+        sys.stdout.write("\033[H\033[2J")